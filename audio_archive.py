@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+
+from wav_writer import StreamingWavWriter, read_wav_layout
+
+# ---------------------------------------------------------------------------
+# Compressed audio archive
+# ---------------------------------------------------------------------------
+#
+# Sessions can be archived as WAV (uncompressed, ~115 MB per hour at 16 kHz),
+# FLAC (lossless, typically 50-75% of WAV for speech) or Ogg Opus (lossy,
+# around a tenth of WAV).  FLAC and Opus are encoded with libsndfile through
+# the optional soundfile package.
+
+# Format name -> (file extension, libsndfile format, libsndfile subtype)
+ARCHIVE_FORMATS = {
+    "wav": (".wav", None, None),
+    "flac": (".flac", "FLAC", "PCM_16"),
+    "opus": (".opus", "OGG", "OPUS"),
+}
+AUDIO_EXTENSIONS = tuple(extension for extension, _, _ in ARCHIVE_FORMATS.values())
+
+
+def import_soundfile():
+    try:
+        import soundfile
+    except ImportError as e:
+        raise ImportError("FLAC and Opus archives need the soundfile package (pip install soundfile)") from e
+    return soundfile
+
+
+def archive_format_for(filename):
+    """Return the archive format name for a filename, based on its extension."""
+    extension = os.path.splitext(filename)[1].lower()
+    for name, (format_extension, _, _) in ARCHIVE_FORMATS.items():
+        if extension == format_extension:
+            return name
+    raise ValueError(f"Unsupported audio file type {extension!r}; expected one of {', '.join(AUDIO_EXTENSIONS)}")
+
+
+class StreamingSoundFileWriter(StreamingWavWriter):
+    """
+    StreamingWavWriter that encodes to FLAC or Ogg Opus instead of WAV.
+
+    Encoding happens in the writer thread, one batch at a time, so the
+    capture loop still only queues buffers.  Each batch is flushed to disk,
+    but the stream length is only written on close: after a crash an Opus
+    file still reads up to its last complete page, while a FLAC file has to
+    be decoded with the flac tool (flac -d) as libsndfile can't seek in it.
+    """
+
+    def __init__(self, filename, sample_width, channels, rate, archive_format="flac", **kwargs):
+        if archive_format not in ("flac", "opus"):
+            raise ValueError(f"Unsupported compressed format {archive_format!r}; expected 'flac' or 'opus'")
+        if sample_width != 2:
+            raise ValueError(f"Only 16-bit audio can be archived as {archive_format}, got {sample_width * 8}-bit")
+        self.archive_format = archive_format
+        self._soundfile = import_soundfile()
+        super().__init__(filename, sample_width, channels, rate, **kwargs)
+
+    def _open(self):
+        _, container, subtype = ARCHIVE_FORMATS[self.archive_format]
+        return self._soundfile.SoundFile(
+            self.filename, 'w', samplerate=self.rate, channels=self.channels, format=container, subtype=subtype
+        )
+
+    def _write_batch(self, batch):
+        samples = np.frombuffer(b''.join(batch), dtype='<i2').reshape(-1, self.channels)
+        self._file.write(samples)
+        self._file.flush()
+
+    def _finish(self):
+        self._file.close()
+
+
+def open_audio_writer(filename, sample_width, channels, rate, **kwargs):
+    """Open a streaming writer for `filename` in the format its extension names."""
+    archive_format = archive_format_for(filename)
+    if archive_format == "wav":
+        return StreamingWavWriter(filename, sample_width, channels, rate, **kwargs)
+    return StreamingSoundFileWriter(filename, sample_width, channels, rate, archive_format=archive_format, **kwargs)
+
+
+def open_wav_samples(filename):
+    """
+    Memory-map the samples of a 16-bit mono WAV file as an int16 array, so
+    only the pages that are actually transcribed are read from disk.
+    """
+    layout = read_wav_layout(filename)
+    if layout['sample_width'] != 2 or layout['channels'] != 1:
+        raise ValueError(f"{filename} must be 16-bit mono PCM")
+    if layout['data_size'] == 0:
+        return np.zeros(0, dtype=np.int16), layout['rate']
+    samples = np.memmap(
+        filename, dtype='<i2', mode='r', offset=layout['data_offset'], shape=(layout['data_size'] // 2,)
+    )
+    return samples, layout['rate']
+
+
+def read_audio_samples(filename):
+    """
+    Return (int16 samples, rate) for a mono WAV, FLAC or Opus recording.
+    WAV files are memory-mapped; compressed files are decoded into memory.
+    """
+    if archive_format_for(filename) == "wav":
+        return open_wav_samples(filename)
+    soundfile = import_soundfile()
+    samples, rate = soundfile.read(filename, dtype='int16', always_2d=True)
+    if samples.shape[1] != 1:
+        raise ValueError(f"{filename} must be mono, got {samples.shape[1]} channels")
+    return samples[:, 0].copy(), rate
@@ -0,0 +1,365 @@
+import abc
+import collections
+import threading
+import time
+import wave
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Audio sources
+# ---------------------------------------------------------------------------
+#
+# record_and_transcribe reads 16-bit PCM blocks from an AudioSource.  Besides
+# the microphone (PyAudioSource) there are sources that replay a WAV file or
+# generate speech-like audio, so the whole pipeline can be run and profiled
+# on a machine without a sound card.
+
+
+class AudioSource(abc.ABC):
+    """
+    Base class for audio sources.
+
+    Subclasses set `rate`, `channels` and `sample_width` and implement
+    `_read(frames)`.  `read(frames)` returns up to `frames` frames of raw
+    little-endian PCM; an empty result means the source is exhausted.
+    With `realtime=True` reads are paced to the sample rate, like a live
+    device; otherwise the source delivers audio as fast as it is consumed.
+    `overflows` counts the times input was lost before it could be read.
+    """
+
+    rate = 16000
+    channels = 1
+    sample_width = 2
+    realtime = False
+
+    def __init__(self):
+        self.frames_read = 0
+        self.overflows = 0
+        self._started = None
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def open(self):
+        self._started = time.perf_counter()
+        return self
+
+    def read(self, frames):
+        if self._started is None:
+            self.open()
+        data = self._read(frames)
+        self.frames_read += len(data) // (self.sample_width * self.channels)
+        if self.realtime:
+            # Sleep until the wall clock catches up with the audio delivered
+            delay = self._started + self.frames_read / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    @abc.abstractmethod
+    def _read(self, frames):
+        """Return up to `frames` frames of raw PCM, or b"" at the end."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PyAudioSource(AudioSource):
+    """
+    Capture from a PyAudio input device (the system default if `input_device`
+    is None).  The stream runs in callback mode: PortAudio hands each buffer
+    to `_callback`, which queues it and counts the buffers flagged with
+    paInputOverflow (input lost *before* that buffer; the buffer itself is
+    intact), and `read` takes audio from the queue.
+    """
+
+    realtime = False  # The device itself paces reads
+
+    def __init__(self, rate=16000, channels=1, frames_per_buffer=1024, input_device=None, audio_format=None):
+        super().__init__()
+        self.rate = rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.input_device = input_device
+        self.audio_format = audio_format
+        self._audio = None
+        self._stream = None
+        self._overflow_flag = 0
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+
+    @property
+    def name(self):
+        return f"input device {self.input_device if self.input_device is not None else '(default)'}"
+
+    def open(self):
+        if self._stream is not None:
+            return self
+        import pyaudio
+
+        if self.audio_format is None:
+            self.audio_format = pyaudio.paInt16
+        self._overflow_flag = pyaudio.paInputOverflow
+        self._continue = pyaudio.paContinue
+        self._audio = pyaudio.PyAudio()
+        self.sample_width = self._audio.get_sample_size(self.audio_format)
+        stream_params = {
+            'format': self.audio_format,
+            'channels': self.channels,
+            'rate': self.rate,
+            'input': True,
+            'frames_per_buffer': self.frames_per_buffer,
+            'stream_callback': self._callback,
+        }
+        if self.input_device is not None:
+            stream_params['input_device_index'] = self.input_device
+        try:
+            self._stream = self._audio.open(**stream_params)
+        except Exception:
+            self._audio.terminate()
+            self._audio = None
+            raise
+        return super().open()
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        # Runs on PortAudio's thread; only queue the buffer
+        with self._cond:
+            if status_flags & self._overflow_flag:
+                self.overflows += 1
+            self._buffer += in_data
+            self._cond.notify()
+        return None, self._continue
+
+    def _read(self, frames):
+        wanted = frames * self.sample_width * self.channels
+        with self._cond:
+            while len(self._buffer) < wanted and self._stream is not None and self._stream.is_active():
+                self._cond.wait(timeout=1.0)
+            data = bytes(self._buffer[:wanted])
+            del self._buffer[:wanted]
+        return data
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+
+class WavFileSource(AudioSource):
+    """
+    Replay a 16-bit WAV file, either in real time or as fast as it is read.
+    The file must match the recorder's sample rate and channel count.
+    """
+
+    def __init__(self, filename, realtime=False, loops=1):
+        super().__init__()
+        self.filename = filename
+        self.realtime = realtime
+        self.loops = loops
+        self._wav = None
+        self._loops_left = loops
+
+        with wave.open(filename, 'rb') as wf:
+            self.rate = wf.getframerate()
+            self.channels = wf.getnchannels()
+            self.sample_width = wf.getsampwidth()
+            self.duration = wf.getnframes() / self.rate * loops
+        if self.sample_width != 2:
+            raise ValueError(f"{filename} must be 16-bit PCM, got {self.sample_width * 8}-bit")
+
+    @property
+    def name(self):
+        return self.filename
+
+    def open(self):
+        if self._wav is None:
+            self._wav = wave.open(self.filename, 'rb')
+            self._loops_left = self.loops - 1
+        return super().open()
+
+    def _read(self, frames):
+        data = self._wav.readframes(frames)
+        if not data and self._loops_left > 0:
+            self._loops_left -= 1
+            self._wav.rewind()
+            data = self._wav.readframes(frames)
+        return data
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class SyntheticSource(AudioSource):
+    """
+    Generate mono audio that loosely resembles speech: amplitude-modulated
+    harmonics over low-level noise, in bursts of `speech_seconds` separated
+    by `pause_seconds` of near-silence so VAD segmentation has something to
+    cut at.  Output is deterministic for a given `seed`.
+    """
+
+    def __init__(self, seconds, rate=16000, realtime=False, speech_seconds=4.0, pause_seconds=1.0,
+                 level=0.3, seed=0):
+        super().__init__()
+        self.rate = rate
+        self.duration = seconds
+        self.realtime = realtime
+        self.speech_seconds = speech_seconds
+        self.pause_seconds = pause_seconds
+        self.level = level
+        self._total = int(seconds * rate)
+        self._rng = np.random.default_rng(seed)
+
+    def _read(self, frames):
+        start = self.frames_read
+        count = min(frames, self._total - start)
+        if count <= 0:
+            return b''
+        t = np.arange(start, start + count, dtype=np.float64) / self.rate
+        envelope = 0.5 * (1.0 + np.sin(2 * np.pi * 3.0 * t))
+        signal = sum(np.sin(2 * np.pi * f * t) / (k + 1) for k, f in enumerate((180.0, 360.0, 720.0)))
+        period = self.speech_seconds + self.pause_seconds
+        speaking = np.mod(t, period) < self.speech_seconds
+        signal = self.level * envelope * signal * speaking + 0.002 * self._rng.standard_normal(count)
+        return np.clip(signal * 32767, -32768, 32767).astype(np.int16).tobytes()
+
+
+# ---------------------------------------------------------------------------
+# Continuous capture split into back-to-back sessions
+# ---------------------------------------------------------------------------
+
+class ContinuousCapture:
+    """
+    Read a source without pause on a background thread and hand its audio
+    to consecutive sessions (see `session`), so the device stays open and
+    no samples are lost while one session is finishing and the next is
+    starting.  Blocks wait in memory until a session reads them.
+    """
+
+    def __init__(self, source, frames_per_read=1024):
+        self.source = source
+        self.frames_per_read = frames_per_read
+        self.error = None
+        self._blocks = collections.deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._ended = False
+        self._thread = None
+
+    @property
+    def name(self):
+        return self.source.name
+
+    @property
+    def ended(self):
+        """True once the source has run out or failed (see `error`); no more audio will arrive."""
+        with self._cond:
+            return self._ended
+
+    @property
+    def buffered_frames(self):
+        """Frames captured but not yet read by a session."""
+        with self._cond:
+            return sum(len(block) for block in self._blocks) // self._frame_bytes
+
+    @property
+    def _frame_bytes(self):
+        return self.source.sample_width * self.source.channels
+
+    def start(self):
+        if self._thread is None:
+            self.source.open()
+            self._thread = threading.Thread(target=self._run, name="continuous-capture", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                data = self.source.read(self.frames_per_read)
+            except Exception as e:
+                self.error = e
+                data = b''
+            with self._cond:
+                if data:
+                    self._blocks.append(data)
+                else:
+                    self._ended = True  # The source ran out or failed
+                self._cond.notify_all()
+            if not data:
+                return
+
+    def session(self, frames):
+        """Return an AudioSource delivering the next `frames` frames."""
+        return CaptureSession(self, frames)
+
+    def _take(self, max_bytes):
+        # Return the next block (at most max_bytes; the rest stays queued for
+        # the next reader), or b'' once capture has ended
+        with self._cond:
+            while not self._blocks and not self._ended and not self._stopped:
+                self._cond.wait()
+            if not self._blocks:
+                return b''
+            block = self._blocks.popleft()
+            if len(block) > max_bytes:
+                self._blocks.appendleft(block[max_bytes:])
+                block = block[:max_bytes]
+            return block
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
+
+
+class CaptureSession(AudioSource):
+    """
+    A fixed number of frames from a ContinuousCapture.  Closing it leaves
+    the capture running; `finished` is set once all frames have been read.
+    `overflows` counts the device's overflows since the session started.
+    """
+
+    def __init__(self, capture, frames):
+        super().__init__()
+        self.capture = capture
+        self.frames = frames
+        self.rate = capture.source.rate
+        self.channels = capture.source.channels
+        self.sample_width = capture.source.sample_width
+        self.finished = threading.Event()
+        self._overflows_before = capture.source.overflows
+
+    @property
+    def name(self):
+        return self.capture.name
+
+    def _read(self, frames):
+        remaining = self.frames - self.frames_read
+        if remaining <= 0:
+            self.finished.set()
+            return b''
+        frame_bytes = self.sample_width * self.channels
+        data = self.capture._take(min(frames, remaining) * frame_bytes)
+        self.overflows = self.capture.source.overflows - self._overflows_before
+        # read() adds this block to frames_read after we return
+        if self.frames_read + len(data) // frame_bytes >= self.frames or not data:
+            self.finished.set()
+        return data
@@ -0,0 +1,44 @@
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# PCM conversion helpers
+# ---------------------------------------------------------------------------
+
+# Scale factor that maps the int16 range onto [-1.0, 1.0), matching what
+# whisper.load_audio() produces after ffmpeg decoding.
+INT16_SCALE = 1.0 / 32768.0
+
+
+def pcm16_to_float32(pcm, out=None):
+    """
+    Convert 16-bit little-endian PCM into a float32 array in [-1.0, 1.0).
+
+    `pcm` can be raw bytes (as returned by stream.read), a bytearray,
+    a memoryview or an int16 NumPy array.  No intermediate copy of the
+    int16 data is made; the only allocation is the float32 output, which
+    can be supplied via `out` to reuse a buffer.
+    """
+    if isinstance(pcm, np.ndarray):
+        if pcm.dtype != np.int16:
+            raise ValueError(f"Expected int16 samples, got {pcm.dtype}")
+        samples = pcm.reshape(-1)
+    else:
+        samples = np.frombuffer(pcm, dtype=np.int16)
+
+    if out is None:
+        out = np.empty(samples.shape[0], dtype=np.float32)
+    elif out.shape[0] < samples.shape[0]:
+        raise ValueError(f"Output buffer too small: {out.shape[0]} < {samples.shape[0]} samples")
+    else:
+        out = out[:samples.shape[0]]
+
+    np.multiply(samples, INT16_SCALE, out=out, casting="unsafe")
+    return out
+
+
+def frames_to_float32(frames):
+    """
+    Convert a list of PyAudio frame buffers into one float32 array that can
+    be passed straight to model.transcribe() without touching the disk.
+    """
+    return pcm16_to_float32(b''.join(frames))
@@ -0,0 +1,120 @@
+import abc
+
+# ---------------------------------------------------------------------------
+# Transcription backends
+# ---------------------------------------------------------------------------
+#
+# Every backend exposes transcribe(audio, **options) taking a 16 kHz float32
+# NumPy array and returning a Whisper-style result dict:
+#
+#     {"text": "...", "segments": [{"start": 0.0, "end": 2.5, "text": "..."}]}
+#
+# so call sites don't care which engine produced it.  Heavy imports (torch,
+# whisper, ctranslate2) happen when a backend is constructed, not on import.
+
+
+class TranscriptionBackend(abc.ABC):
+    """Base class for speech-to-text engines used by the recorder."""
+
+    name = None
+
+    @abc.abstractmethod
+    def transcribe(self, audio, **options):
+        """Transcribe 16 kHz float32 audio into a Whisper-style result dict."""
+
+
+class WhisperBackend(TranscriptionBackend):
+    """The reference openai-whisper implementation (fp32 on CPU, fp16 on GPU)."""
+
+    name = "openai-whisper"
+
+    def __init__(self, model_size, threads=None, device=None):
+        import torch
+        import whisper
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(model_size, device=device)
+        self.fp16 = self.model.device.type != "cpu"
+
+    def transcribe(self, audio, **options):
+        # Whisper falls back from fp16 on CPU anyway, with a warning per call
+        options.setdefault("fp16", self.fp16)
+        return self.model.transcribe(audio, **options)
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """
+    openai-whisper with its linear layers dynamically quantized to int8.
+
+    Needs no extra dependency and roughly halves decode time on CPU; the
+    convolutions and embeddings stay in fp32.
+    """
+
+    name = "openai-whisper-int8"
+
+    def __init__(self, model_size, threads=None):
+        import torch
+
+        super().__init__(model_size, threads=threads, device="cpu")
+        # whisper.model.Linear only overrides forward() to cast the weights
+        # for fp16; as plain nn.Linear modules they are picked up by
+        # quantize_dynamic, which matches on exact module type
+        for module in self.model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.fp16 = False
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    CTranslate2-based faster-whisper engine (pip install faster-whisper).
+    `compute_type` "int8" gives quantized CPU inference.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size, threads=None, compute_type="int8", device="cpu"):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=threads or 0)
+
+    def transcribe(self, audio, **options):
+        # Drop openai-whisper-only options so callers can pass the same set
+        options.pop("fp16", None)
+        options.pop("verbose", None)
+        segments, info = self.model.transcribe(audio, **options)
+        result_segments = []
+        for segment in segments:
+            entry = {"start": segment.start, "end": segment.end, "text": segment.text}
+            if segment.words is not None:
+                entry["words"] = [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in segment.words
+                ]
+            result_segments.append(entry)
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (WhisperBackend, QuantizedWhisperBackend, FasterWhisperBackend)
+}
+
+
+def load_backend(name, model_size, threads=None, **options):
+    """
+    Construct the backend registered as `name` with the given model size.
+    `threads` caps the CPU threads it uses; other options are passed to the
+    backend (e.g. compute_type for faster-whisper).
+    """
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcription backend {name!r}; expected one of {', '.join(BACKENDS)}") from None
+    return backend(model_size, threads=threads, **options)
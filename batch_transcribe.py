@@ -0,0 +1,301 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from audio_archive import AUDIO_EXTENSIONS, read_audio_samples
+from audio_utils import pcm16_to_float32
+from segment_store import SegmentWriter, sidecar_path_for
+from transcription_pool import OrderedResults, TranscriptionPool
+from vad import VadSegmenter
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+AUDIO_DIR = "saved_audio"
+TRANSCRIPTIONS_DIR = "transcriptions"
+MANIFEST_NAME = ".batch_manifest.json"
+RATE = 16000
+CHUNK_DURATION = 15  # Seconds per segment, as in live recording
+SEGMENT_LEVEL = "segment"  # Timed rows saved next to each transcript: "segment", "word" or None
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def fixed_segments(n_samples, segment_samples):
+    return [(start, min(start + segment_samples, n_samples)) for start in range(0, n_samples, segment_samples)]
+
+
+def vad_segments(samples, rate):
+    segmenter = VadSegmenter(rate=rate)
+    segments = []
+    block = 1 << 16
+    for start in range(0, samples.shape[0], block):
+        segments.extend(segmenter.feed(samples[start:start + block]))
+    segments.extend(segmenter.flush())
+    return segments
+
+
+def recording_start_time(audio_file):
+    """
+    Wall-clock start of a session from its filename
+    (Day_YYYY-MM-DD_HH-MM-SS.wav), used to stamp chunks like live
+    transcription does.  Falls back to midnight, so stamps become offsets.
+    """
+    match = re.search(r'(\d{4}-\d{2}-\d{2})_(\d{2}-\d{2}-\d{2})', os.path.basename(audio_file))
+    if match:
+        return datetime.datetime.strptime(f"{match.group(1)} {match.group(2)}", "%Y-%m-%d %H-%M-%S")
+    return datetime.datetime.combine(datetime.date.today(), datetime.time())
+
+
+def transcript_path_for(audio_file, audio_dir, transcriptions_dir):
+    """saved_audio/2024_April/X.wav -> transcriptions/2024_April/X.txt"""
+    relative = os.path.relpath(audio_file, audio_dir)
+    return os.path.join(transcriptions_dir, os.path.splitext(relative)[0] + ".txt")
+
+
+def find_audio_files(audio_dir):
+    audio_files = []
+    for root, _, files in os.walk(audio_dir):
+        for file in files:
+            if file.lower().endswith(AUDIO_EXTENSIONS):
+                audio_files.append(os.path.join(root, file))
+    return sorted(audio_files)
+
+
+# ---------------------------------------------------------------------------
+# Progress manifest
+# ---------------------------------------------------------------------------
+
+
+class BatchManifest:
+    """
+    Records which settings each transcript was produced with, so a rerun
+    skips files whose transcript is already up to date and redoes the ones
+    made with a different model or segmentation.  Saved after every file,
+    so an interrupted batch resumes where it stopped.  The live
+    recorder adds an entry for each complete session it transcribed with
+    one set of settings; a transcript without an entry is never current.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read {path} ({e}); starting a new manifest")
+            self.entries = {}
+
+    @staticmethod
+    def fingerprint(audio_file, settings):
+        stat = os.stat(audio_file)
+        return {"size": stat.st_size, "mtime": int(stat.st_mtime), **settings}
+
+    def is_current(self, audio_file, transcript_file, settings):
+        if not os.path.exists(transcript_file):
+            return False
+        return self.entries.get(audio_file) == self.fingerprint(audio_file, settings)
+
+    def record(self, audio_file, settings):
+        with self._lock:
+            self.entries[audio_file] = self.fingerprint(audio_file, settings)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+
+
+# ---------------------------------------------------------------------------
+# Batch transcription
+# ---------------------------------------------------------------------------
+
+
+class _FileJob:
+    """Collects the out-of-order chunk results of one file into its transcript."""
+
+    def __init__(self, audio_file, transcript_file, segments, rate, on_done):
+        self.audio_file = audio_file
+        self.transcript_file = transcript_file
+        self.remaining = len(segments)
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._on_done = on_done
+        self._lock = threading.Lock()
+        self._segments = segments
+        self._rate = rate
+        self._start_time = recording_start_time(audio_file)
+
+        os.makedirs(os.path.dirname(transcript_file) or ".", exist_ok=True)
+        # Written to a temporary file and renamed once complete, so a crash
+        # never leaves a partial transcript that looks finished
+        self._temp_file = transcript_file + ".partial"
+        self._out = open(self._temp_file, 'w')
+        self._segments_file = sidecar_path_for(transcript_file)
+        self._segment_writer = None
+        if SEGMENT_LEVEL:
+            self._segment_writer = SegmentWriter(self._segments_file + ".partial", SEGMENT_LEVEL)
+        self._ordered = OrderedResults(self._write_chunk)
+        if self.remaining == 0:
+            self._finish()
+
+    def _write_chunk(self, number, result):
+        if result is None:
+            return
+        chunk_text, timed_segments = result
+        offset = self._segments[number - 1][0] / self._rate
+        timestamp = (self._start_time + datetime.timedelta(seconds=offset)).strftime("%H:%M:%S")
+        self._out.write(f"[Chunk {number} - {timestamp}] {chunk_text}\n\n")
+        if self._segment_writer is not None and timed_segments is not None:
+            self._segment_writer.append(number, offset, timed_segments)
+
+    def add(self, number, chunk_text, timed_segments=None):
+        if chunk_text is None:
+            self.failed += 1
+        self._ordered.add(number, None if chunk_text is None else (chunk_text, timed_segments))
+        with self._lock:
+            self.remaining -= 1
+            finished = self.remaining == 0
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        self._out.close()
+        if self._segment_writer is not None:
+            self._segment_writer.close()
+            os.replace(self._segment_writer.path, self._segments_file)
+        os.replace(self._temp_file, self.transcript_file)
+        self._on_done(self)
+
+
+def transcribe_archive(audio_dir=AUDIO_DIR, transcriptions_dir=TRANSCRIPTIONS_DIR, backend="openai-whisper",
+                       model_name="medium", workers=1, segmentation="fixed", chunk_duration=CHUNK_DURATION,
+                       force=False, **backend_options):
+    """
+    Transcribe every recording (WAV, FLAC or Opus) under `audio_dir` whose transcript is missing or was
+    made with different settings.  Segments from all files are fanned out
+    across `workers` processes; each transcript is written in chunk order.
+    """
+    audio_files = find_audio_files(audio_dir)
+    if not audio_files:
+        print(f"No audio files found in {audio_dir}")
+        return
+
+    os.makedirs(transcriptions_dir, exist_ok=True)
+    manifest = BatchManifest(os.path.join(transcriptions_dir, MANIFEST_NAME))
+    settings = {"backend": backend, "model": model_name, "segmentation": segmentation, "chunk_duration": chunk_duration}
+
+    pending = []
+    for audio_file in audio_files:
+        transcript_file = transcript_path_for(audio_file, audio_dir, transcriptions_dir)
+        if not force and manifest.is_current(audio_file, transcript_file, settings):
+            continue
+        pending.append((audio_file, transcript_file))
+
+    print(f"Found {len(audio_files)} audio files, {len(audio_files) - len(pending)} already transcribed")
+    if not pending:
+        return
+    print("-" * 40)
+
+    completed = []
+    done_lock = threading.Lock()
+
+    def file_done(job):
+        if job.failed:
+            # Leave it out of the manifest so the next run retries it
+            print(f"Finished {job.transcript_file} with {job.failed} failed chunks")
+        else:
+            manifest.record(job.audio_file, settings)
+            print(f"Finished {job.transcript_file} in {time.perf_counter() - job.started:.1f}s")
+        with done_lock:
+            completed.append(job)
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    with TranscriptionPool(backend, model_name, workers, **backend_options) as pool:
+        pool.warm_up(wait=False)
+        for i, (audio_file, transcript_file) in enumerate(pending):
+            try:
+                samples, rate = read_audio_samples(audio_file)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {audio_file}: {e}")
+                continue
+            if rate != RATE:
+                print(f"Skipping {audio_file}: {rate} Hz, expected {RATE} Hz")
+                continue
+
+            if segmentation == "vad":
+                segments = vad_segments(samples, rate)
+            else:
+                segments = fixed_segments(samples.shape[0], int(chunk_duration * rate))
+            audio_seconds += samples.shape[0] / rate
+            print(f"Processing file {i + 1}/{len(pending)}: {audio_file} ({len(segments)} segments)")
+
+            job = _FileJob(audio_file, transcript_file, segments, rate, file_done)
+            for number, (seg_start, seg_end) in enumerate(segments, start=1):
+                # Blocks while all workers are busy; only this segment is
+                # read from the memory-mapped file
+                future = pool.submit(
+                    number, pcm16_to_float32(samples[seg_start:seg_end]), segment_level=SEGMENT_LEVEL,
+                    **({"word_timestamps": True} if SEGMENT_LEVEL == "word" else {}),
+                )
+                future.add_done_callback(lambda f, job=job, number=number: _collect(job, number, f))
+
+    elapsed = time.perf_counter() - start
+    print("-" * 40)
+    print(f"Transcribed {len(completed)} files ({format_duration(audio_seconds)} of audio) in {format_duration(elapsed)}")
+
+
+def _collect(job, number, future):
+    try:
+        _, chunk_text, _, timed_segments = future.result()
+    except Exception as e:
+        print(f"Error transcribing chunk {number} of {job.audio_file}: {e}")
+        chunk_text = timed_segments = None
+    job.add(number, chunk_text, timed_segments)
+
+
+def format_duration(seconds):
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Transcribe (or re-transcribe) the audio archive in saved_audio/. "
+                    "Files with an up-to-date transcript are skipped, so an interrupted run can be resumed."
+    )
+    parser.add_argument("--audio-dir", default=AUDIO_DIR)
+    parser.add_argument("--transcriptions-dir", default=TRANSCRIPTIONS_DIR)
+    parser.add_argument("--backend", default="openai-whisper")
+    parser.add_argument("--model", default="medium")
+    parser.add_argument("--compute-type", help="faster-whisper compute type, e.g. int8")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 8))
+    parser.add_argument("--segmentation", choices=("fixed", "vad"), default="fixed")
+    parser.add_argument("--chunk-duration", type=float, default=CHUNK_DURATION)
+    parser.add_argument("--force", action="store_true", help="Re-transcribe files even if they look up to date")
+    args = parser.parse_args()
+
+    options = {"compute_type": args.compute_type} if args.compute_type else {}
+    try:
+        transcribe_archive(
+            args.audio_dir, args.transcriptions_dir, args.backend, args.model, args.workers,
+            args.segmentation, args.chunk_duration, args.force, **options,
+        )
+    except KeyboardInterrupt:
+        print("\nBatch stopped by user. Run again to resume.")
+        sys.exit(1)
@@ -0,0 +1,7 @@
+"""
+Benchmarks for the recording/transcription pipeline.
+
+Run them from the repository root so the top-level modules are importable:
+
+    python -m benchmarks.chunk_latency --help
+"""
@@ -0,0 +1,74 @@
+"""
+Encode cost versus bytes saved for the session archive formats.  Each
+recording is streamed through the same writer the recorder uses, in
+CHUNK-sized blocks, and the CPU time spent (in all threads) is reported as a
+percentage of one core at real time, next to the file size relative to WAV.
+
+    python -m benchmarks.archive_formats saved_audio/2024_April/*.wav
+    python -m benchmarks.archive_formats --seconds 600           # synthetic audio
+
+Synthetic audio compresses far better than real speech and room noise, so
+use real recordings for numbers that matter.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from audio_archive import ARCHIVE_FORMATS, open_audio_writer, read_audio_samples
+from benchmarks.common import CHUNK, RATE, synthetic_pcm
+
+
+def encode(pcm, filename):
+    """Stream `pcm` through the archive writer; return (cpu_seconds, wall_seconds)."""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    with open_audio_writer(filename, 2, 1, RATE) as writer:
+        for i in range(0, pcm.shape[0], CHUNK):
+            writer.write(pcm[i:i + CHUNK].tobytes())
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="*", help="16 kHz mono recordings (default: synthetic audio)")
+    parser.add_argument("--seconds", type=float, default=300.0, help="Length of synthetic audio")
+    parser.add_argument("--formats", nargs="+", default=list(ARCHIVE_FORMATS), choices=list(ARCHIVE_FORMATS))
+    args = parser.parse_args()
+
+    inputs = []
+    for path in args.recordings:
+        pcm, rate = read_audio_samples(path)
+        if rate != RATE:
+            parser.error(f"{path} is {rate} Hz; expected {RATE} Hz")
+        inputs.append(pcm)
+    if not inputs:
+        inputs.append(synthetic_pcm(args.seconds))
+    audio_seconds = sum(pcm.shape[0] for pcm in inputs) / RATE
+
+    print(f"{len(inputs)} recording(s), {audio_seconds:.0f}s of audio")
+    print(f"{'format':>7} {'MB/hour':>8} {'vs WAV':>7} {'encode CPU':>11} {'core %':>7} {'decode (s)':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        wav_size = None
+        for archive_format in args.formats:
+            extension = ARCHIVE_FORMATS[archive_format][0]
+            size = cpu = decode = 0.0
+            try:
+                for i, pcm in enumerate(inputs):
+                    filename = os.path.join(workdir, f"{i}{extension}")
+                    cpu += encode(pcm, filename)[0]
+                    size += os.path.getsize(filename)
+                    start = time.perf_counter()
+                    read_audio_samples(filename)
+                    decode += time.perf_counter() - start
+            except ImportError as e:
+                print(f"{archive_format:>7} skipped: {e}")
+                continue
+            if archive_format == "wav":
+                wav_size = size
+            ratio = f"{size / wav_size * 100:6.1f}%" if wav_size else "      -"
+            print(f"{archive_format:>7} {size / audio_seconds * 3600 / 1e6:>8.1f} {ratio:>7} {cpu:>10.2f}s "
+                  f"{cpu / audio_seconds * 100:>6.2f}% {decode:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
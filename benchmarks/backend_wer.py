@@ -0,0 +1,84 @@
+"""
+Word error rate versus speed for transcription backends over a local corpus.
+
+The corpus is a directory of 16 kHz 16-bit mono WAV files, each with a
+reference transcript next to it (lecture01.wav + lecture01.txt).  Each
+configuration is BACKEND:MODEL, optionally followed by :COMPUTE_TYPE for
+faster-whisper.
+
+    python -m benchmarks.backend_wer corpus/ \\
+        openai-whisper:medium openai-whisper-int8:medium faster-whisper:medium:int8
+"""
+import argparse
+import os
+import time
+
+from audio_utils import pcm16_to_float32
+from backends import load_backend
+from benchmarks.common import RATE, normalize_words, read_wav_pcm, word_error_rate
+
+
+def load_corpus(directory):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".wav"):
+            continue
+        reference_path = os.path.join(directory, name[:-4] + ".txt")
+        if not os.path.exists(reference_path):
+            print(f"Skipping {name}: no reference transcript")
+            continue
+        pcm, rate = read_wav_pcm(os.path.join(directory, name))
+        if rate != RATE:
+            print(f"Skipping {name}: {rate} Hz, expected {RATE} Hz")
+            continue
+        with open(reference_path) as f:
+            corpus.append((name, pcm16_to_float32(pcm), f.read()))
+    return corpus
+
+
+def parse_config(spec):
+    parts = spec.split(":")
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"Expected BACKEND:MODEL[:COMPUTE_TYPE], got {spec!r}")
+    options = {"compute_type": parts[2]} if len(parts) == 3 else {}
+    return parts[0], parts[1], options
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Directory of WAV files with .txt references")
+    parser.add_argument("configs", nargs="+", type=parse_config, help="BACKEND:MODEL[:COMPUTE_TYPE]")
+    parser.add_argument("--threads", type=int, help="CPU threads per backend")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"No usable WAV/reference pairs in {args.corpus}")
+    audio_seconds = sum(audio.shape[0] for _, audio, _ in corpus) / RATE
+    print(f"Corpus: {len(corpus)} files, {audio_seconds:.0f}s of audio\n")
+
+    print(f"{'backend':<22} {'model':<10} {'load (s)':>9} {'decode (s)':>11} {'realtime x':>11} {'WER':>7}")
+    for backend, model_size, options in args.configs:
+        start = time.perf_counter()
+        engine = load_backend(backend, model_size, threads=args.threads, **options)
+        load_seconds = time.perf_counter() - start
+
+        errors = reference_words = 0.0
+        start = time.perf_counter()
+        for _, audio, reference in corpus:
+            hypothesis = engine.transcribe(audio)["text"]
+            words = len(normalize_words(reference))
+            errors += word_error_rate(reference, hypothesis) * words
+            reference_words += words
+        decode_seconds = time.perf_counter() - start
+
+        label = backend + (f" ({options['compute_type']})" if options else "")
+        print(
+            f"{label:<22} {model_size:<10} {load_seconds:>9.1f} {decode_seconds:>11.1f} "
+            f"{audio_seconds / decode_seconds:>11.2f} {errors / max(reference_words, 1):>7.1%}"
+        )
+        del engine
+
+
+if __name__ == "__main__":
+    main()
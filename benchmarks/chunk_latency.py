@@ -0,0 +1,79 @@
+"""
+Per-chunk latency of the file-based transcription path (write temp WAV,
+decode it again with ffmpeg) versus the in-memory float32 path.
+
+    python -m benchmarks.chunk_latency                      # preparation only
+    python -m benchmarks.chunk_latency --model base         # include model.transcribe
+    python -m benchmarks.chunk_latency --wav lecture.wav    # use real audio
+"""
+import argparse
+import os
+import tempfile
+import wave
+
+from audio_utils import frames_to_float32
+from benchmarks.common import RATE, pcm_to_frames, read_wav_pcm, report, synthetic_pcm, timed
+
+
+def prepare_via_file(frames, workdir, index):
+    """The pre-existing path: temp WAV on disk, then ffmpeg decode/resample."""
+    import whisper
+
+    temp_filename = os.path.join(workdir, f"temp_chunk_{index}.wav")
+    with wave.open(temp_filename, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(b''.join(frames))
+    audio = whisper.load_audio(temp_filename)
+    os.remove(temp_filename)
+    return audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="16 kHz 16-bit mono WAV to slice into chunks (default: synthetic audio)")
+    parser.add_argument("--chunk-seconds", type=float, default=15.0)
+    parser.add_argument("--chunks", type=int, default=5)
+    parser.add_argument("--model", help="Whisper model to run on each chunk (default: skip decoding)")
+    args = parser.parse_args()
+
+    if args.wav:
+        pcm, rate = read_wav_pcm(args.wav)
+        if rate != RATE:
+            parser.error(f"{args.wav} is {rate} Hz; expected {RATE} Hz")
+    else:
+        pcm = synthetic_pcm(args.chunk_seconds * args.chunks)
+
+    samples_per_chunk = int(RATE * args.chunk_seconds)
+    chunks = [pcm_to_frames(pcm[i:i + samples_per_chunk]) for i in range(0, pcm.shape[0], samples_per_chunk)]
+    chunks = chunks[:args.chunks]
+
+    model = None
+    if args.model:
+        import whisper
+        model = whisper.load_model(args.model)
+
+    file_times, memory_times = [], []
+    with tempfile.TemporaryDirectory() as workdir:
+        for index, frames in enumerate(chunks, start=1):
+            audio, elapsed = timed(prepare_via_file, frames, workdir, index)
+            if model is not None:
+                _, decode = timed(model.transcribe, audio)
+                elapsed += decode
+            file_times.append(elapsed)
+
+            audio, elapsed = timed(frames_to_float32, frames)
+            if model is not None:
+                _, decode = timed(model.transcribe, audio)
+                elapsed += decode
+            memory_times.append(elapsed)
+
+    scope = f"prepare + transcribe ({args.model})" if model is not None else "prepare only"
+    print(f"{len(chunks)} chunks of {args.chunk_seconds:g}s, {scope}")
+    report("file-based (temp WAV + ffmpeg)", file_times)
+    report("in-memory (float32)", memory_times)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Time to extract a short clip from a session recording at a random position,
+for recordings of increasing length: SessionAudio (memory-mapped WAV, or
+seeking FLAC) against loading the whole file first.
+
+    python -m benchmarks.clip_extraction --minutes 10 60 240
+    python -m benchmarks.clip_extraction --format flac
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from audio_archive import ARCHIVE_FORMATS, open_audio_writer, read_audio_samples
+from benchmarks.common import RATE, report, synthetic_pcm, timed
+from segment_store import SessionAudio
+
+
+def write_recording(filename, minutes):
+    block = synthetic_pcm(60)
+    with open_audio_writer(filename, 2, 1, RATE) as writer:
+        for _ in range(int(minutes)):
+            writer.write(block.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 240])
+    parser.add_argument("--format", choices=["wav", "flac"], default="wav")
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--clips", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        for minutes in args.minutes:
+            filename = os.path.join(workdir, f"{minutes:g}min{ARCHIVE_FORMATS[args.format][0]}")
+            write_recording(filename, minutes)
+            duration = int(minutes) * 60
+            positions = [random.uniform(0, duration - args.clip_seconds) for _ in range(args.clips)]
+
+            clip_times = []
+            with SessionAudio(filename) as audio:
+                for start in positions:
+                    clip, elapsed = timed(audio.clip, start, start + args.clip_seconds)
+                    clip.sum()  # Touch the samples so mapped pages are actually read
+                    clip_times.append(elapsed)
+
+            full_times = []
+            for start in positions[:3]:
+                (samples, _), elapsed = timed(read_audio_samples, filename)
+                if args.format == "wav":
+                    samples = samples.copy()  # What reading the whole file into memory costs
+                    elapsed += timed(samples.sum)[1]
+                full_times.append(elapsed)
+
+            print(f"{minutes:g}-minute {args.format} ({os.path.getsize(filename) / 1e6:.0f} MB)")
+            report("  SessionAudio.clip", clip_times)
+            report("  load whole file", full_times)
+
+
+if __name__ == "__main__":
+    main()
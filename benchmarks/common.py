@@ -0,0 +1,83 @@
+import re
+import statistics
+import time
+import wave
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Shared helpers for the benchmark scripts
+# ---------------------------------------------------------------------------
+
+RATE = 16000
+CHUNK = 1024
+
+
+def synthetic_pcm(seconds, rate=RATE, seed=0):
+    """
+    Generate int16 mono PCM that loosely resembles speech: a few
+    amplitude-modulated harmonics on top of low-level noise.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate), dtype=np.float32) / rate
+    envelope = 0.5 * (1.0 + np.sin(2 * np.pi * 3.0 * t))
+    signal = sum(np.sin(2 * np.pi * f * t) / (k + 1) for k, f in enumerate((180.0, 360.0, 720.0)))
+    signal = 0.3 * envelope * signal + 0.02 * rng.standard_normal(t.shape[0])
+    return np.clip(signal * 32767, -32768, 32767).astype(np.int16)
+
+
+def read_wav_pcm(path):
+    """Read a 16-bit mono WAV file into an int16 array."""
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"{path} must be 16-bit mono PCM")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16), wf.getframerate()
+
+
+def pcm_to_frames(pcm, frames_per_buffer=CHUNK):
+    """Split int16 samples into the list of bytes objects stream.read() would return."""
+    return [pcm[i:i + frames_per_buffer].tobytes() for i in range(0, pcm.shape[0], frames_per_buffer)]
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, elapsed_seconds)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label, timings):
+    """Print min/median/mean/max for a list of timings in seconds."""
+    if not timings:
+        print(f"{label:<32} no samples")
+        return
+    print(
+        f"{label:<32} n={len(timings):<4} "
+        f"min={min(timings) * 1000:9.2f} ms  "
+        f"median={statistics.median(timings) * 1000:9.2f} ms  "
+        f"mean={statistics.fmean(timings) * 1000:9.2f} ms  "
+        f"max={max(timings) * 1000:9.2f} ms"
+    )
+
+
+def normalize_words(text):
+    """Lower-case, strip punctuation and split into words for WER scoring."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,                           # deletion
+                current[j - 1] + 1,                        # insertion
+                previous[j - 1] + (ref_word != hyp_word),  # substitution
+            )
+        previous = current
+    return previous[-1] / len(ref)
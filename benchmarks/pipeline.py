@@ -0,0 +1,121 @@
+"""
+End-to-end benchmark of the live pipeline: drives record_and_transcribe()
+from a file or synthetic audio source instead of a microphone, so it runs
+headless, and reports throughput and per-chunk latency from the pipeline
+metrics.
+
+    python -m benchmarks.pipeline --model base --seconds 300
+    python -m benchmarks.pipeline --wav lecture.wav --realtime --workers 1 2
+    python -m benchmarks.pipeline --segmentation vad --policy merge
+    python -m benchmarks.pipeline --sessions 3      # back-to-back sessions, as --daemon
+
+As-fast-as-possible runs size the queue and capture buffer to hold the
+whole input, so nothing is dropped and the wall time is the pipeline's
+throughput.  --realtime runs replay at the sample rate with the normal
+queue, showing the latency and drops a live session would see.
+"""
+import argparse
+import contextlib
+import math
+import os
+import sys
+import tempfile
+import time
+
+import main as recorder
+from audio_sources import ContinuousCapture, SyntheticSource, WavFileSource
+from metrics import METRICS
+
+
+def make_source(args):
+    if args.wav:
+        return WavFileSource(args.wav, realtime=args.realtime, loops=args.loops)
+    return SyntheticSource(args.seconds, rate=recorder.RATE, realtime=args.realtime)
+
+
+def run(args, workers, output_dir):
+    recorder.TRANSCRIPTION_WORKERS = workers
+    source = make_source(args)
+    recorder.RECORD_SECONDS = source.duration + 1
+    if not args.realtime:
+        # Queue everything instead of applying the overload policy
+        recorder.TRANSCRIPTION_QUEUE_SIZE = math.ceil(source.duration / recorder.VAD_MIN_SEGMENT) + 2
+        recorder.CAPTURE_BUFFER_SEGMENTS = math.ceil(source.duration / recorder.CHUNK_DURATION) + 2
+
+    METRICS.reset()
+    label = f"{workers}w"
+    audio_file = os.path.join(output_dir, f"{label}.wav")
+    transcript_file = os.path.join(output_dir, f"{label}.txt")
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if args.sessions > 1:
+            success = run_sessions(args.sessions, source, audio_file, transcript_file)
+        else:
+            success = recorder.record_and_transcribe(audio_file, transcript_file, source=source)
+    wall = time.perf_counter() - start
+    if not success:
+        print(f"{workers} workers: pipeline reported an error", file=sys.stderr)
+
+    stats = METRICS.to_dict()
+    return wall, source.frames_read / source.rate, stats
+
+
+def run_sessions(sessions, source, audio_file, transcript_file):
+    # Split the input into consecutive sessions read from one ContinuousCapture,
+    # the way --daemon splits the microphone
+    capture = ContinuousCapture(source, recorder.CHUNK).start()
+    session_frames = math.ceil(source.duration * source.rate / sessions / recorder.CHUNK) * recorder.CHUNK
+    recorder.RECORD_SECONDS = session_frames / source.rate + 1
+    success = True
+    try:
+        for number in range(1, sessions + 1):
+            name = f"{os.path.splitext(transcript_file)[0]}_s{number}"
+            success = recorder.record_and_transcribe(
+                f"{name}.wav", f"{name}.txt", source=capture.session(session_frames), progress=False
+            ) and success
+    finally:
+        capture.close()
+    return success
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="16 kHz 16-bit mono WAV to replay (default: synthetic audio)")
+    parser.add_argument("--loops", type=int, default=1, help="Replay the WAV file this many times")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Length of synthetic audio")
+    parser.add_argument("--realtime", action="store_true", help="Pace the source at the sample rate")
+    parser.add_argument("--backend", default=recorder.TRANSCRIPTION_BACKEND)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--segmentation", choices=["fixed", "vad"], default=recorder.SEGMENTATION)
+    parser.add_argument("--policy", default=recorder.OVERLOAD_POLICY, help="Overload policy")
+    parser.add_argument("--sessions", type=int, default=1, help="Split the input into this many back-to-back sessions")
+    args = parser.parse_args()
+
+    recorder.TRANSCRIPTION_BACKEND = args.backend
+    recorder.WHISPER_MODEL = args.model
+    recorder.SEGMENTATION = args.segmentation
+    recorder.OVERLOAD_POLICY = args.policy
+    # Keep benchmark transcripts out of the real search index
+    recorder.SEARCH_INDEX = False
+    if 1 in args.workers:
+        # Load the in-process model up front so it isn't part of the first run
+        if recorder.get_model() is None:
+            sys.exit(1)
+
+    mode = "real time" if args.realtime else "as fast as possible"
+    print(f"{args.backend} model '{args.model}', {args.segmentation} segmentation, {args.policy} policy, {mode}")
+    print(f"{'workers':>8} {'audio (s)':>10} {'wall (s)':>9} {'realtime x':>11} {'chunks':>7} {'dropped':>8} "
+          f"{'latency p50':>12} {'p95':>7} {'decode RTF p50':>15}")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for workers in args.workers:
+            wall, audio_seconds, stats = run(args, workers, output_dir)
+            latency = stats["chunk_latency_seconds"]
+            print(f"{workers:>8} {audio_seconds:>10.0f} {wall:>9.1f} {audio_seconds / wall:>11.2f} "
+                  f"{latency['count']:>7} {stats['chunks_dropped']:>8} "
+                  f"{latency['p50']:>11.2f}s {latency['p95']:>6.2f}s {stats['chunk_realtime_factor']['p50']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
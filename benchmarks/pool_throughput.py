@@ -0,0 +1,58 @@
+"""
+Transcription throughput of TranscriptionPool as a function of worker count,
+reported as a realtime factor (seconds of audio transcribed per wall-clock
+second; above 1.0 keeps up with a live stream).
+
+    python -m benchmarks.pool_throughput --model medium --workers 1 2 4 8
+    python -m benchmarks.pool_throughput --wav lecture.wav --chunks 32
+"""
+import argparse
+import time
+
+from audio_utils import pcm16_to_float32
+from benchmarks.common import RATE, read_wav_pcm, synthetic_pcm
+from transcription_pool import TranscriptionPool
+
+
+def run(backend, model_name, workers, chunks, threads_per_worker):
+    with TranscriptionPool(backend, model_name, workers, threads_per_worker=threads_per_worker) as pool:
+        # Model loading is a one-off cost; keep it out of the measurement
+        pool.warm_up()
+        start = time.perf_counter()
+        futures = [pool.submit(index, audio) for index, audio in enumerate(chunks)]
+        decode_seconds = sum(future.result()[2] for future in futures)
+        return time.perf_counter() - start, decode_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="16 kHz 16-bit mono WAV to slice into chunks (default: synthetic audio)")
+    parser.add_argument("--backend", default="openai-whisper")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads-per-worker", type=int, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--chunk-seconds", type=float, default=15.0)
+    parser.add_argument("--chunks", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.wav:
+        pcm, rate = read_wav_pcm(args.wav)
+        if rate != RATE:
+            parser.error(f"{args.wav} is {rate} Hz; expected {RATE} Hz")
+    else:
+        pcm = synthetic_pcm(args.chunk_seconds * args.chunks)
+
+    samples_per_chunk = int(RATE * args.chunk_seconds)
+    chunks = [pcm16_to_float32(pcm[i:i + samples_per_chunk]) for i in range(0, pcm.shape[0], samples_per_chunk)]
+    chunks = chunks[:args.chunks]
+    audio_seconds = sum(chunk.shape[0] for chunk in chunks) / RATE
+
+    print(f"{len(chunks)} chunks, {audio_seconds:.0f}s of audio, {args.backend} model '{args.model}'")
+    print(f"{'workers':>8} {'wall (s)':>10} {'decode (s)':>11} {'realtime x':>11}")
+    for workers in args.workers:
+        wall, decode = run(args.backend, args.model, workers, chunks, args.threads_per_worker)
+        print(f"{workers:>8} {wall:>10.1f} {decode:>11.1f} {audio_seconds / wall:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
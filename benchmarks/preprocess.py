@@ -0,0 +1,52 @@
+"""
+CPU cost of the capture-side preprocessing stage (high-pass filter, AGC and
+level/clipping stats) on 16 kHz audio, in PyAudio-sized blocks, as a share
+of one core.
+
+    python -m benchmarks.preprocess --seconds 600
+    python -m benchmarks.preprocess --file lecture.wav
+"""
+import argparse
+import time
+
+from benchmarks.common import CHUNK, RATE, pcm_to_frames, read_wav_pcm, report, synthetic_pcm
+from preprocess import BlockPreprocessor
+
+
+def run(frames, rate, **options):
+    preprocessor = BlockPreprocessor(rate, CHUNK, **options)
+    timings = []
+    for block in frames:
+        started = time.perf_counter()
+        preprocessor.process(block)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=600, help="Length of synthetic audio")
+    parser.add_argument("--file", help="16-bit mono WAV to process instead of synthetic audio")
+    args = parser.parse_args()
+
+    if args.file:
+        pcm, rate = read_wav_pcm(args.file)
+    else:
+        pcm, rate = synthetic_pcm(args.seconds), RATE
+    frames = pcm_to_frames(pcm)
+    audio_seconds = pcm.shape[0] / rate
+    run(frames[:50], rate)  # Warm up
+
+    print(f"{audio_seconds:.0f}s of {rate} Hz audio in {len(frames)} blocks of {CHUNK} frames")
+    for label, options in (
+        ("high-pass + AGC + stats", {}),
+        ("high-pass + stats", {"max_gain_db": None}),
+        ("stats only", {"highpass_hz": None, "max_gain_db": None}),
+    ):
+        timings = run(frames, rate, **options)
+        report(f"  {label}", timings)
+        print(f"  {'':<32} {sum(timings) / audio_seconds * 100:.3f}% of one core")
+
+
+if __name__ == "__main__":
+    main()
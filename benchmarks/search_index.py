@@ -0,0 +1,106 @@
+"""
+Build time and query latency of the transcript search index at archive
+scale.  Generates a synthetic archive of transcripts in the live
+`[Chunk N - HH:MM:SS]` format (Zipf-distributed words, so there are both
+very common and rare terms), indexes it from scratch, re-runs the update
+after appending to a few files, and times a mix of queries.
+
+    python -m benchmarks.search_index --sessions 10000 --chunks 40
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from transcript_index import TranscriptIndex
+
+
+def make_vocabulary(size, rng):
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return ["".join(rng.choice(letters, rng.integers(3, 10))) for _ in range(size)]
+
+
+def chunk_text(vocabulary, rng, words=40):
+    indices = np.minimum(rng.zipf(1.3, words) - 1, len(vocabulary) - 1)
+    return " ".join(vocabulary[i] for i in indices)
+
+
+def write_archive(root, sessions, chunks, vocabulary, rng):
+    for session in range(sessions):
+        month_dir = os.path.join(root, f"2024_Month{session % 12 + 1:02d}")
+        os.makedirs(month_dir, exist_ok=True)
+        with open(os.path.join(month_dir, f"session_{session:06d}.txt"), 'w') as f:
+            for number in range(1, chunks + 1):
+                f.write(f"[Chunk {number} - 10:{number // 4 % 60:02d}:{number * 15 % 60:02d}] "
+                        f"{chunk_text(vocabulary, rng)}\n\n")
+
+
+def percentile(values, q):
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--chunks", type=int, default=40, help="Chunks per session (40 = 10 minutes)")
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query type")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        transcriptions_dir = os.path.join(workdir, "transcriptions")
+        start = time.perf_counter()
+        write_archive(transcriptions_dir, args.sessions, args.chunks, vocabulary, rng)
+        print(f"Generated {args.sessions} sessions x {args.chunks} chunks in {time.perf_counter() - start:.1f}s")
+
+        index = TranscriptIndex(os.path.join(workdir, "index.sqlite"))
+        start = time.perf_counter()
+        files, chunks = index.update(transcriptions_dir, workdir)
+        build = time.perf_counter() - start
+        size = os.path.getsize(index.path) / 1e6
+        print(f"Full build:         {build:8.2f}s  ({chunks / build:,.0f} chunks/s, {size:.0f} MB)")
+
+        start = time.perf_counter()
+        index.update(transcriptions_dir, workdir)
+        print(f"No-op update:       {time.perf_counter() - start:8.2f}s")
+
+        # Append a chunk to 1% of the sessions, as live recording would
+        appended = rng.choice(args.sessions, max(1, args.sessions // 100), replace=False)
+        for session in appended:
+            path = os.path.join(transcriptions_dir, f"2024_Month{session % 12 + 1:02d}", f"session_{session:06d}.txt")
+            with open(path, 'a') as f:
+                f.write(f"[Chunk {args.chunks + 1} - 11:00:00] {chunk_text(vocabulary, rng)}\n\n")
+        start = time.perf_counter()
+        files, chunks = index.update(transcriptions_dir, workdir)
+        print(f"Incremental update: {time.perf_counter() - start:8.2f}s  ({chunks} chunks in {files} files)")
+
+        start = time.perf_counter()
+        index.add_chunk(os.path.join(transcriptions_dir, "live.txt"), 1, "12:00:00", chunk_text(vocabulary, rng), 0, 15)
+        print(f"Live add_chunk:     {(time.perf_counter() - start) * 1000:8.2f}ms")
+
+        query_types = {
+            "common word": lambda: vocabulary[rng.integers(0, 10)],
+            "rare word": lambda: vocabulary[rng.integers(1000, len(vocabulary))],
+            "two words": lambda: f"{vocabulary[rng.integers(0, 100)]} {vocabulary[rng.integers(100, 2000)]}",
+        }
+        print(f"\n{'query':<12} {'p50 (ms)':>9} {'p95 (ms)':>9} {'mean hits':>10}")
+        for label, make_query in query_types.items():
+            timings, hits = [], []
+            for _ in range(args.queries):
+                query = make_query()
+                start = time.perf_counter()
+                hits.append(len(index.search(query, limit=20)))
+                timings.append(time.perf_counter() - start)
+            print(f"{label:<12} {percentile(timings, 0.5) * 1000:>9.2f} {percentile(timings, 0.95) * 1000:>9.2f} "
+                  f"{statistics.fmean(hits):>10.1f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Startup cost of main.py: how long a fresh interpreter takes to import it,
+list devices, and (optionally) have the Whisper model ready.
+
+    python -m benchmarks.startup_time
+    python -m benchmarks.startup_time --with-model --repeats 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ("import helpers", "from main import format_time, save_wav_file"),
+    ("import main", "import main"),
+    ("list devices", "import main; main.list_audio_devices()"),
+]
+MODEL_SCENARIO = ("model ready", "import main; main.start_model_loading(); main.get_model()")
+
+
+def time_command(code):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--with-model", action="store_true", help="Also time until the Whisper model is loaded")
+    args = parser.parse_args()
+
+    scenarios = SCENARIOS + ([MODEL_SCENARIO] if args.with_model else [])
+    baseline = statistics.median(time_command("pass") for _ in range(args.repeats))
+    print(f"{'scenario':<16} {'median (s)':>11} {'min (s)':>9}   (interpreter startup {baseline:.3f}s)")
+    for label, code in scenarios:
+        timings = [time_command(code) for _ in range(args.repeats)]
+        print(f"{label:<16} {statistics.median(timings):>11.3f} {min(timings):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
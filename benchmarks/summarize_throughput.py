@@ -0,0 +1,100 @@
+"""
+Throughput of batch summarisation against a local fake Gemini client that
+simulates network latency and transient failures, so concurrency, rate
+limiting and retries can be tuned without spending API quota.
+
+    python -m benchmarks.summarize_throughput --files 40 --workers 1 4 8
+    python -m benchmarks.summarize_throughput --latency 2.0 --failure-rate 0.2 --rpm 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+import summarize
+from summary_cache import SummaryCache
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class FakeClient:
+    """Stands in for genai.Client: same models.generate_content call shape."""
+
+    def __init__(self, latency, failure_rate, seed=0):
+        self.models = self
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, model, contents):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+            delay = self.latency * (0.5 + self._random.random())
+        time.sleep(delay)
+        if fail:
+            raise FakeAPIError(self._random.choice((429, 503)))
+        return type("Response", (), {"text": f"Summary of {len(contents)} characters"})()
+
+
+def make_transcripts(directory, count):
+    month_dir = os.path.join(directory, "transcriptions", "2024_April")
+    os.makedirs(month_dir)
+    for i in range(count):
+        with open(os.path.join(month_dir, f"Monday_2024-04-{i % 28 + 1:02d}_10-00-{i % 60:02d}.txt"), 'w') as f:
+            for chunk in range(1, 121):
+                f.write(f"[Chunk {chunk} - 10:{chunk // 4:02d}:00] Lecture {i}, content for chunk {chunk}.\n\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean fake request latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.1)
+    parser.add_argument("--rpm", type=float, default=600, help="Requests per minute allowed by the token bucket")
+    args = parser.parse_args()
+
+    # Keep the retry delays proportional to the fake latency
+    summarize.RETRY_BACKOFF = args.latency / 4
+
+    print(f"{args.files} transcripts, ~{args.latency}s latency, {args.failure_rate:.0%} transient failures, {args.rpm:g} RPM")
+    print(f"{'workers':>8} {'wall (s)':>9} {'files/min':>10} {'API calls':>10} {'cached rerun (s)':>17}")
+    cwd = os.getcwd()
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            make_transcripts(directory, args.files)
+            client = FakeClient(args.latency, args.failure_rate)
+            cache = SummaryCache(os.path.join(directory, "cache.sqlite"))
+            os.chdir(directory)
+            try:
+                timings = []
+                # Second pass is served entirely from the summary cache
+                for _ in range(2):
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results = summarize.summarize_all_transcripts(
+                            "transcriptions", client=client, max_workers=workers,
+                            requests_per_minute=args.rpm, cache=cache,
+                        )
+                    timings.append(time.perf_counter() - start)
+            finally:
+                os.chdir(cwd)
+                cache.close()
+        wall, rerun = timings
+        done = sum(1 for _, output_file, _ in results if output_file)
+        print(f"{workers:>8} {wall:>9.1f} {done / wall * 60:>10.1f} {client.calls:>10} {rerun:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+How much audio (and, optionally, Whisper decode time) VAD segmentation
+saves compared with fixed CHUNK_DURATION cuts, over a set of recordings.
+
+    python -m benchmarks.vad_savings saved_audio/2024_April/*.wav
+    python -m benchmarks.vad_savings --model medium lecture.wav
+"""
+import argparse
+import time
+
+from audio_utils import pcm16_to_float32
+from audio_archive import read_audio_samples
+from benchmarks.common import CHUNK, RATE
+from vad import VadSegmenter
+
+
+def vad_segments(pcm, args):
+    segmenter = VadSegmenter(
+        rate=RATE,
+        threshold_db=args.threshold_db,
+        min_length=args.min_segment,
+        max_length=args.max_segment,
+        min_silence=args.min_silence,
+    )
+    segments = []
+    start = time.perf_counter()
+    for i in range(0, pcm.shape[0], CHUNK):
+        segments.extend(segmenter.feed(pcm[i:i + CHUNK]))
+    segments.extend(segmenter.flush())
+    return segments, time.perf_counter() - start
+
+
+def decode_time(model, pcm, segments):
+    start = time.perf_counter()
+    for seg_start, seg_end in segments:
+        model.transcribe(pcm16_to_float32(pcm[seg_start:seg_end]))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav", nargs="+", help="16 kHz mono recordings (WAV, FLAC or Opus)")
+    parser.add_argument("--model", help="Also time Whisper on both segmentations (slow)")
+    parser.add_argument("--chunk-seconds", type=float, default=15.0)
+    parser.add_argument("--threshold-db", type=float, default=-45.0)
+    parser.add_argument("--min-segment", type=float, default=3.0)
+    parser.add_argument("--max-segment", type=float, default=30.0)
+    parser.add_argument("--min-silence", type=float, default=0.6)
+    args = parser.parse_args()
+
+    model = None
+    if args.model:
+        import whisper
+        model = whisper.load_model(args.model)
+
+    total_audio = total_speech = total_fixed_decode = total_vad_decode = 0.0
+    print(f"{'file':<40} {'audio':>8} {'kept':>6} {'segments':>9} {'mean len':>9} {'VAD cost':>9}")
+    for path in args.wav:
+        pcm, rate = read_audio_samples(path)
+        if rate != RATE:
+            print(f"Skipping {path}: {rate} Hz, expected {RATE} Hz")
+            continue
+        segments, vad_seconds = vad_segments(pcm, args)
+        audio_seconds = pcm.shape[0] / RATE
+        speech_seconds = sum(end - start for start, end in segments) / RATE
+        mean_length = speech_seconds / len(segments) if segments else 0.0
+        total_audio += audio_seconds
+        total_speech += speech_seconds
+        print(
+            f"{path[-40:]:<40} {audio_seconds:>7.0f}s {speech_seconds / audio_seconds:>6.0%} "
+            f"{len(segments):>9} {mean_length:>8.1f}s {vad_seconds / audio_seconds:>9.2e}"
+        )
+
+        if model is not None:
+            step = int(RATE * args.chunk_seconds)
+            fixed = [(i, min(i + step, pcm.shape[0])) for i in range(0, pcm.shape[0], step)]
+            total_fixed_decode += decode_time(model, pcm, fixed)
+            total_vad_decode += decode_time(model, pcm, segments)
+
+    if total_audio:
+        print(f"\nAudio sent to Whisper: {total_speech:.0f}s of {total_audio:.0f}s "
+              f"({1 - total_speech / total_audio:.0%} skipped as silence)")
+    if model is not None and total_fixed_decode:
+        print(f"Whisper time: fixed {total_fixed_decode:.1f}s, VAD {total_vad_decode:.1f}s "
+              f"({1 - total_vad_decode / total_fixed_decode:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Preallocated capture ring buffer
+# ---------------------------------------------------------------------------
+
+
+class CaptureBuffer:
+    """
+    Fixed-size ring of int16 samples shared between the capture loop and
+    the transcription thread.
+
+    Samples are addressed by their absolute position in the session (the
+    number of samples captured before them), so a segment can be described
+    by a plain (start, end) pair and put on a queue.  Memory use is fixed at
+    `capacity` samples no matter how long the session runs; once the writer
+    laps the ring the oldest samples are overwritten and any segment that
+    still refers to them becomes invalid (see `is_valid`).
+
+    There is a single writer (the capture loop).  Readers never block it.
+    """
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        # Samples fully written, and samples the writer has started to write.
+        # `_reserved` is bumped before the copy so readers can tell when a
+        # region is about to be overwritten.
+        self.written = 0
+        self._reserved = 0
+
+    @classmethod
+    def for_segments(cls, segment_samples, segments):
+        """
+        Size the ring to hold a whole number of segments, so segments that
+        start on a segment boundary never wrap and can be handed out as views.
+        """
+        return cls(segment_samples * segments)
+
+    def write(self, data):
+        """
+        Append raw int16 PCM (bytes from stream.read or an int16 array) and
+        return the absolute position after the write.
+        """
+        samples = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.int16)
+        n = samples.shape[0]
+        if n > self.capacity:
+            # Only the newest `capacity` samples can be kept anyway
+            self.written += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        self._reserved = self.written + n
+        offset = self.written % self.capacity
+        first = min(n, self.capacity - offset)
+        self._data[offset:offset + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+        self.written += n
+        return self.written
+
+    def is_valid(self, start):
+        """
+        True if the samples from `start` onwards have not been (and are not
+        being) overwritten.  Check this after consuming a view to detect the
+        writer lapping a slow reader.
+        """
+        return start >= self._reserved - self.capacity
+
+    def segment(self, start, end):
+        """
+        Return the samples in [start, end) as an int16 array.
+
+        The result is a view into the ring (no copy) unless the range wraps
+        around the end of the ring, in which case the two halves are joined.
+        Raises ValueError if the range is not (or no longer) in the buffer.
+        """
+        if end < start or end > self.written:
+            raise ValueError(f"Segment [{start}, {end}) is outside the captured range (0, {self.written})")
+        if not self.is_valid(start):
+            raise ValueError(f"Segment [{start}, {end}) has already been overwritten")
+
+        offset = start % self.capacity
+        length = end - start
+        if offset + length <= self.capacity:
+            return self._data[offset:offset + length]
+        return np.concatenate((self._data[offset:], self._data[:offset + length - self.capacity]))
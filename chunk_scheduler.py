@@ -0,0 +1,116 @@
+import queue
+import threading
+
+# ---------------------------------------------------------------------------
+# Bounded transcription queue with overload handling
+# ---------------------------------------------------------------------------
+
+OVERLOAD_POLICIES = ("drop_oldest", "merge", "fallback_model")
+
+
+class ChunkScheduler(queue.Queue):
+    """
+    Bounded queue of (start, end) sample ranges waiting for transcription.
+
+    It keeps the queue.Queue interface (get with timeouts, task_done, join)
+    so consumers can block instead of polling, but `put` never blocks the
+    capture loop.  When `maxsize` ranges are already waiting, the overload
+    policy decides what happens to the new one:
+
+    - "drop_oldest":    discard the oldest waiting range
+    - "merge":          extend the newest waiting range when the new one
+                        follows or overlaps it (up to `max_merge_samples`),
+                        otherwise drop the oldest
+    - "fallback_model": call `on_overload` once so the caller can switch to
+                        a cheaper model, and drop the oldest meanwhile
+
+    Lag is measured in samples between the end of the newest captured range
+    and the end of the newest range that has been transcribed or dropped.
+    """
+
+    def __init__(self, maxsize=4, policy="drop_oldest", rate=16000, max_merge_samples=None, on_overload=None):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy {policy!r}; expected one of {', '.join(OVERLOAD_POLICIES)}")
+        if maxsize <= 0:
+            raise ValueError(f"Scheduler queue must be bounded, got maxsize={maxsize}")
+        # The underlying Queue is unbounded so put() never waits; the bound
+        # is enforced by the overload policy in _put
+        super().__init__()
+        self.limit = maxsize
+        self.policy = policy
+        self.rate = rate
+        self.max_merge_samples = max_merge_samples
+        self.on_overload = on_overload
+
+        self.captured_end = 0
+        self.processed_end = 0
+        self.dropped_chunks = 0
+        self.merged_chunks = 0
+        self.overloads = 0
+        self._overload_signalled = False
+
+    # -- queue.Queue hooks (called with self.mutex held) ---------------------
+
+    def _put(self, item):
+        start, end = item
+        self.captured_end = max(self.captured_end, end)
+
+        if len(self.queue) >= self.limit:
+            self.overloads += 1
+            if self.policy == "merge" and self._merge(start, end):
+                return
+            if self.policy == "fallback_model" and not self._overload_signalled and self.on_overload is not None:
+                self._overload_signalled = True
+                # Run outside the queue lock; the callback may load a model
+                threading.Thread(target=self.on_overload, daemon=True).start()
+            self._drop_oldest()
+
+        self.queue.append(item)
+
+    def _merge(self, start, end):
+        last_start, last_end = self.queue[-1]
+        if not last_start <= start <= last_end:
+            return False
+        if self.max_merge_samples is not None and end - last_start > self.max_merge_samples:
+            return False
+        self.queue[-1] = (last_start, end)
+        self.merged_chunks += 1
+        # put() counts the new item as an unfinished task, but it was folded
+        # into one that is already counted
+        self.unfinished_tasks -= 1
+        return True
+
+    def _drop_oldest(self):
+        _, dropped_end = self.queue.popleft()
+        self.dropped_chunks += 1
+        self.processed_end = max(self.processed_end, dropped_end)
+        # The dropped range will never be marked done by a consumer
+        self.unfinished_tasks -= 1
+
+    # -- Consumer side -------------------------------------------------------
+
+    def complete(self, item):
+        """Mark a range returned by get() as transcribed (also calls task_done)."""
+        with self.mutex:
+            self.processed_end = max(self.processed_end, item[1])
+        self.task_done()
+
+    @property
+    def lag_samples(self):
+        with self.mutex:
+            return max(0, self.captured_end - self.processed_end)
+
+    @property
+    def lag_seconds(self):
+        return self.lag_samples / self.rate
+
+    def stats(self):
+        """Snapshot of the scheduler counters for progress display and logs."""
+        with self.mutex:
+            return {
+                "queued": len(self.queue),
+                "lag_seconds": max(0, self.captured_end - self.processed_end) / self.rate,
+                "dropped": self.dropped_chunks,
+                "merged": self.merged_chunks,
+                "overloads": self.overloads,
+            }
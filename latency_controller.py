@@ -0,0 +1,219 @@
+import datetime
+import json
+import math
+import os
+import threading
+
+# ---------------------------------------------------------------------------
+# Adaptive chunk length and model size
+# ---------------------------------------------------------------------------
+#
+# A chunk's text appears roughly `chunk * (1 + rtf) + backlog * rtf` seconds
+# after its first word was spoken, where rtf is decode time / audio time and
+# backlog is the audio still waiting in the queue.  The controller measures
+# rtf from every decoded chunk.  With headroom it shortens chunks step by
+# step towards the minimum, so text appears sooner.  When the estimate goes
+# over the target it cuts straight to the longest chunk that fits, and
+# while the model struggles to keep up it lengthens chunks again (longer
+# chunks spread Whisper's fixed per-call cost).  When even the best chunk
+# can't meet the target, or the model can't keep up with real time at all,
+# it steps down to a smaller model; when the host has plenty of headroom it
+# steps back up.  Every decision is appended to a JSON-lines audit log.
+
+MODEL_LADDER = ("tiny", "base", "small", "medium", "large")
+
+# Rough CPU decode cost of each model relative to "tiny", used to predict
+# the realtime factor after a switch before it has been measured
+MODEL_COST = {"tiny": 1.0, "base": 1.8, "small": 5.0, "medium": 13.0, "large": 26.0}
+
+# Chunks shrink by this factor per decision while there is headroom, and
+# grow by its inverse while the model is struggling
+CHUNK_STEP = 0.75
+
+
+class LatencyController:
+    """
+    Choose the chunk length and model size that keep transcription within
+    `target_latency` seconds of the speech.
+
+    Call `observe` after every decoded chunk.  It returns None or a decision
+    dict: {"action": "chunk", "to": seconds, ...} to change the segment
+    length, or {"action": "model", "to": name, ...} to switch models.  After
+    acting on a model decision, call `model_switched` (with ok=False if the
+    load failed); no further decisions are made in between.  Also call it
+    when something else (the fallback_model overload policy) switches the
+    model.  Decisions wait for `settle_chunks` new measurements after each
+    change.
+
+    Models are stepped through `models`, smallest first, never above
+    `max_model` (the starting model by default).  Safe to call from the
+    pool's callback threads.
+    """
+
+    def __init__(self, chunk_seconds, model_name, target_latency=20.0, min_chunk=5.0, max_chunk=30.0,
+                 models=MODEL_LADDER, max_model=None, high_water=0.8, low_water=0.3, smoothing=0.3,
+                 settle_chunks=3, log_file=None):
+        if not 0 < min_chunk <= max_chunk:
+            raise ValueError(f"Need 0 < min_chunk <= max_chunk, got {min_chunk} and {max_chunk}")
+        if not 0 < low_water < high_water < 1:
+            raise ValueError(f"Need 0 < low_water < high_water < 1, got {low_water} and {high_water}")
+        self.target_latency = target_latency
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.high_water = high_water
+        self.low_water = low_water
+        self.smoothing = smoothing
+        self.settle_chunks = settle_chunks
+        self.log_file = log_file
+
+        self.chunk_seconds = min(max(chunk_seconds, min_chunk), max_chunk)
+        self.model_name = model_name
+        # Models we may switch between; an unknown model (or one outside the
+        # ladder) is never switched away from
+        max_model = max_model or model_name
+        if model_name in models and max_model in models:
+            self.models = tuple(models[:models.index(max_model) + 1])
+        else:
+            self.models = (model_name,)
+        self.rtf = None
+        self.decisions = 0
+        self._failed_models = set()
+        self._switching_to = None
+        self._since_change = 0
+        self._lock = threading.Lock()
+
+    def chunk_samples(self, rate, block=1):
+        """The current chunk length in samples, rounded down to whole blocks."""
+        return max(block, int(self.chunk_seconds * rate) // block * block)
+
+    def projected_latency(self, rtf, chunk_seconds, lag_seconds=0.0):
+        """Seconds from a chunk's first word to its text, at this rtf and backlog."""
+        return chunk_seconds * (1.0 + rtf) + lag_seconds * rtf
+
+    def ideal_chunk(self, rtf, lag_seconds=0.0):
+        """The longest chunk whose projected latency fits the target (clamped)."""
+        chunk = (self.target_latency - lag_seconds * rtf) / (1.0 + rtf)
+        return self._round_chunk(chunk)  # Whole half seconds, so small rtf noise doesn't move it
+
+    def observe(self, audio_seconds, decode_seconds, lag_seconds=0.0):
+        """Record one decoded chunk and return a decision, or None."""
+        if audio_seconds <= 0:
+            return None
+        rtf = decode_seconds / audio_seconds
+        with self._lock:
+            self.rtf = rtf if self.rtf is None else self.smoothing * rtf + (1 - self.smoothing) * self.rtf
+            self._since_change += 1
+            if self._switching_to is not None or self._since_change < self.settle_chunks:
+                return None
+            return self._decide(lag_seconds)
+
+    def _decide(self, lag_seconds):
+        rtf = self.rtf
+        projected = self.projected_latency(rtf, self.chunk_seconds, lag_seconds)
+        index = self.models.index(self.model_name) if self.model_name in self.models else None
+        smaller = self._usable(self.models[:index][::-1]) if index is not None else None
+        larger = self._usable(self.models[index + 1:]) if index is not None else None
+
+        ideal = self.ideal_chunk(rtf, lag_seconds)
+        best = self.projected_latency(rtf, ideal, lag_seconds)
+
+        # The model can't keep up with real time, and chunks shortened while
+        # there was headroom can't grow any further (or it's hopeless anyway)
+        if rtf > self.high_water and smaller is not None and (rtf >= 1.0 or self.chunk_seconds >= ideal):
+            return self._switch_model(smaller, f"realtime factor {rtf:.2f} is above {self.high_water:.2f}",
+                                      lag_seconds, projected)
+
+        if best > self.target_latency and smaller is not None:
+            return self._switch_model(smaller, f"even {ideal:g}s chunks would take {best:.1f}s", lag_seconds, projected)
+
+        # Plenty of headroom: try the next larger model if it should still fit
+        if larger is not None and rtf < self.low_water and lag_seconds < self.chunk_seconds:
+            predicted = rtf * MODEL_COST[larger] / MODEL_COST[self.model_name]
+            if predicted < self.low_water + (self.high_water - self.low_water) / 2:
+                predicted_latency = self.projected_latency(predicted, self.ideal_chunk(predicted))
+                if predicted_latency <= self.target_latency:
+                    return self._switch_model(larger, f"realtime factor {rtf:.2f} leaves headroom "
+                                              f"(predicted {predicted:.2f} on {larger})", lag_seconds, projected)
+
+        # Otherwise move the chunk length
+        if projected > self.target_latency:
+            # Over target: straight to the longest chunk that fits, ignoring changes under 20%
+            if abs(ideal - self.chunk_seconds) >= 0.2 * self.chunk_seconds:
+                return self._set_chunk(ideal, f"projected latency {projected:.0f}s is over the "
+                                       f"{self.target_latency:g}s target", lag_seconds, projected)
+        elif rtf > self.high_water:
+            # Struggling to keep up: longer chunks, while they still fit
+            longer = min(self._round_chunk(self.chunk_seconds / CHUNK_STEP), ideal)
+            if longer > self.chunk_seconds:
+                return self._set_chunk(longer, f"realtime factor {rtf:.2f} is above {self.high_water:.2f}",
+                                       lag_seconds, projected)
+        elif rtf < self.low_water:
+            # Headroom: shorter chunks, so text appears sooner
+            shorter = self._round_chunk(self.chunk_seconds * CHUNK_STEP)
+            if shorter < self.chunk_seconds:
+                return self._set_chunk(shorter, f"realtime factor {rtf:.2f} leaves headroom for shorter chunks",
+                                       lag_seconds, projected)
+        return None
+
+    def _round_chunk(self, chunk):
+        # Whole half seconds, within the limits
+        return min(max(math.floor(chunk * 2) / 2, self.min_chunk), self.max_chunk)
+
+    def _set_chunk(self, chunk, reason, lag_seconds, projected):
+        decision = self._record("chunk", self.chunk_seconds, chunk, reason, lag_seconds, projected)
+        self.chunk_seconds = chunk
+        self._since_change = 0
+        return decision
+
+    def _usable(self, candidates):
+        for name in candidates:
+            if name not in self._failed_models:
+                return name
+        return None
+
+    def _switch_model(self, name, reason, lag_seconds, projected):
+        decision = self._record("model", self.model_name, name, reason, lag_seconds, projected)
+        self._switching_to = name
+        return decision
+
+    def model_switched(self, name, ok=True):
+        """Report the outcome of a model decision, or a switch made elsewhere."""
+        with self._lock:
+            if self._switching_to is not None and self._switching_to != name:
+                return
+            self._switching_to = None
+            self._since_change = 0
+            if not ok:
+                self._failed_models.add(name)
+                self._record("model_failed", self.model_name, name, "model could not be loaded", 0.0, None)
+                return
+            # Start from the predicted rtf until the new model has been measured
+            if self.rtf is not None and name in MODEL_COST and self.model_name in MODEL_COST:
+                self.rtf *= MODEL_COST[name] / MODEL_COST[self.model_name]
+            self.model_name = name
+
+    def _record(self, action, old, new, reason, lag_seconds, projected):
+        self.decisions += 1
+        decision = {
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "action": action,
+            "from": old,
+            "to": new,
+            "reason": reason,
+            "realtime_factor": round(self.rtf, 3) if self.rtf is not None else None,
+            "lag_seconds": round(lag_seconds, 1),
+            "projected_latency": round(projected, 1) if projected is not None else None,
+            "target_latency": self.target_latency,
+            "chunk_seconds": self.chunk_seconds,
+            "model": self.model_name,
+        }
+        if self.log_file:
+            try:
+                directory = os.path.dirname(self.log_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.log_file, 'a') as f:
+                    f.write(json.dumps(decision) + "\n")
+            except OSError as e:
+                print(f"Warning: Could not write to {self.log_file}: {e}")
+        return decision
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import summarize
+
+# ---------------------------------------------------------------------------
+# Rolling summary during recording
+# ---------------------------------------------------------------------------
+
+ROLLING_SUMMARY_PROMPT = (
+    "You are keeping running notes of a lecture/lesson while it is being "
+    "recorded. Update the current notes with the new part of the transcript "
+    "and return the complete, updated set of concise notes with key points "
+    "and takeaways. Do not mention that the notes were updated.\n\n"
+)
+
+
+class LiveSummarizer:
+    """
+    Keep a running summary of a transcript up to date while it is recorded.
+
+    `add_chunk` is cheap and never blocks the caller; a background thread
+    folds the chunks that arrived since the last update into the running
+    summary, at most once every `interval` seconds and with at most
+    `max_fold_chars` of new text per request.  When recording stops,
+    `finish` folds in the last few chunks and saves the summary, so the
+    notes are ready almost immediately instead of after one large request.
+    """
+
+    def __init__(self, transcript_file, interval=60.0, max_fold_chars=20000, client=None):
+        self.transcript_file = transcript_file
+        self.interval = interval
+        self.max_fold_chars = max_fold_chars
+        self.summary = None
+        self.folds = 0
+
+        self._get_client = summarize.lazy_client(client)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-summary", daemon=True)
+        self._thread.start()
+
+    def add_chunk(self, number, text):
+        """Queue a newly transcribed chunk for the next update."""
+        if text:
+            with self._lock:
+                self._pending.append(text)
+            self._wake.set()
+
+    def _take_pending(self):
+        # Take whole chunks up to max_fold_chars (always at least one)
+        with self._lock:
+            taken, size = [], 0
+            while self._pending and (not taken or size + len(self._pending[0]) <= self.max_fold_chars):
+                size += len(self._pending[0])
+                taken.append(self._pending.pop(0))
+            return taken
+
+    def _restore_pending(self, chunks):
+        with self._lock:
+            self._pending[:0] = chunks
+
+    def _fold(self):
+        """Fold pending chunks into the running summary.  Returns False on error."""
+        chunks = self._take_pending()
+        if not chunks:
+            return True
+        text = (
+            f"Current notes:\n{self.summary or '(none yet)'}\n\n"
+            f"New part of the transcript:\n" + "\n\n".join(chunks)
+        )
+        try:
+            self.summary = summarize.request_summary(self._get_client(), text, prompt=ROLLING_SUMMARY_PROMPT)
+            self.folds += 1
+            return True
+        except Exception as e:
+            print(f"\nWarning: live summary update failed: {e}")
+            self._restore_pending(chunks)
+            return False
+
+    def _run(self):
+        last_fold = time.monotonic()
+        while not self._stop.is_set():
+            # Debounce: wait for new text, then for the rest of the interval
+            self._wake.wait(timeout=self.interval)
+            remaining = self.interval - (time.monotonic() - last_fold)
+            if remaining > 0 and self._stop.wait(timeout=remaining):
+                break
+            self._wake.clear()
+            with self._lock:
+                has_pending = bool(self._pending)
+            if has_pending:
+                self._fold()
+                last_fold = time.monotonic()
+
+    def finish(self, timeout=120.0):
+        """
+        Stop the background updates, fold in whatever is left and save the
+        summary next to the other summaries.
+        Returns (summary_text, output_path), or (None, None) on failure.
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending:
+                    break
+            if not self._fold():
+                return None, None
+
+        if self.summary is None:
+            return None, None
+        output_file = summarize.summary_path_for(self.transcript_file)
+        if not summarize.save_summary(output_file, self.summary):
+            return None, None
+        print(f"Live summary saved to: {output_file} ({self.folds} updates)")
+        return self.summary, output_file
@@ -5,12 +5,8 @@ import threading
 import sys
 import calendar
 import queue
-
-from summarize import gemini_summarize
-
-# Create main directories
-os.makedirs("saved_audio", exist_ok=True)
-os.makedirs("transcriptions", exist_ok=True)
+import signal
+import argparse
 
 # Create month directories for the rest of the year
 def create_month_directories():
@@ -18,6 +14,10 @@ def create_month_directories():
     current_year = datetime.datetime.now().year
     next_year = current_year + 1
     
+    # Create main directories
+    os.makedirs("saved_audio", exist_ok=True)
+    os.makedirs("transcriptions", exist_ok=True)
+    
     # Create directories for all months in the current year
     for month in range(1, 13):
         month_name = calendar.month_name[month]
@@ -36,9 +36,6 @@ def create_month_directories():
     
     print(f"Created month directories for {current_year} and {next_year}")
 
-# Create month directories
-create_month_directories()
-
 # Check for required dependencies with helpful error messages
 try:
     import numpy as np
@@ -70,24 +67,41 @@ except ImportError:
     print("Error: wave module not found. This should be part of the standard library.")
     sys.exit(1)
 
-try:
-    import whisper
-    print("Whisper loaded successfully")
-except ImportError:
-    print("Error: OpenAI Whisper is not installed. Please run: pip install openai-whisper")
-    sys.exit(1)
-
 from pathlib import Path
 
-# Initialize Whisper model with medium size for balanced CPU usage
-try:
-    print("Loading Whisper model (this may take a moment)...")
-    model = whisper.load_model("medium")
-    print("Whisper model loaded successfully")
-except Exception as e:
-    print(f"Error loading Whisper model: {e}")
-    print("Please make sure you have enough disk space and a proper internet connection.")
-    sys.exit(1)
+from audio_utils import pcm16_to_float32
+from capture_buffer import CaptureBuffer
+from audio_archive import ARCHIVE_FORMATS, open_audio_writer, read_audio_samples
+from chunk_scheduler import ChunkScheduler
+from transcription_pool import OrderedResults, TranscriptionPool
+from backends import load_backend
+from vad import VadSegmenter
+from preprocess import BlockPreprocessor
+from overlap import keep_window, text_in_window
+from audio_sources import ContinuousCapture, PyAudioSource
+from shared_transcriber import FairTranscriber
+from transcript_index import get_transcript_index, parse_chunks
+from segment_store import SegmentWriter, segments_in_window, sidecar_path_for
+from latency_controller import MODEL_LADDER, LatencyController
+from batch_transcribe import MANIFEST_NAME, TRANSCRIPTIONS_DIR, BatchManifest, recording_start_time
+from session_journal import JOURNAL_DIR, ChunkJournal, find_journals, read_journal
+from metrics import METRICS, COUNT_BUCKETS, RATIO_BUCKETS
+
+# Transcription parameters
+TRANSCRIPTION_BACKEND = "openai-whisper"  # "openai-whisper", "openai-whisper-int8" or "faster-whisper"
+WHISPER_MODEL = "medium"  # Medium size for balanced CPU usage
+TRANSCRIPTION_THREADS = None  # CPU threads for the in-process model (None = library default)
+BACKEND_OPTIONS = {}  # Extra backend settings, e.g. {"compute_type": "int8"} for faster-whisper
+TRANSCRIPTION_WORKERS = 1  # Worker processes decoding chunks in parallel (1 = in-process)
+
+# The Whisper model used for in-process transcription is loaded on demand
+# (see get_model), so importing this module stays cheap
+_model = None
+_model_error = None
+_model_loaded = threading.Event()
+_model_thread = None
+_model_thread_lock = threading.Lock()
+_manifest_lock = threading.Lock()  # Serialises live sessions' updates to the batch manifest
 
 # Audio recording parameters
 FORMAT = pyaudio.paInt16
@@ -95,7 +109,86 @@ CHANNELS = 1
 RATE = 16000
 CHUNK = 1024
 RECORD_SECONDS = 1800  # 30 minutes (1800 seconds)
+ARCHIVE_FORMAT = "wav"  # "wav", "flac" (lossless) or "opus" (lossy, ~10% of WAV); FLAC/Opus need soundfile
 CHUNK_DURATION = 15    # Process transcription in 15-second chunks
+OVERLAP_SECONDS = 0.0  # Fixed segmentation only: audio shared with the previous segment (0 = off)
+PREPROCESS = True  # Filter and level audio before transcription; the saved audio and VAD stay raw
+HIGHPASS_HZ = 80        # DC-blocking high-pass cutoff (None = off)
+AGC_TARGET_DBFS = -20   # Level the automatic gain control aims for
+AGC_MAX_GAIN_DB = 20    # Most the AGC may boost quiet input (None = AGC off)
+SEGMENTATION = "fixed"  # "fixed" (CHUNK_DURATION cuts) or "vad" (cut at pauses, skip silence)
+VAD_THRESHOLD_DB = -45.0  # Frames louder than this (dBFS) count as speech
+VAD_MIN_SEGMENT = 3.0     # Seconds; shorter speech is held until a longer pause
+VAD_MAX_SEGMENT = 2 * CHUNK_DURATION  # Seconds; longer speech is cut at its quietest point
+VAD_MIN_SILENCE = 0.6     # Seconds of pause that end a segment
+TRANSCRIPTION_QUEUE_SIZE = 4  # Segments allowed to wait for transcription before overload
+OVERLOAD_POLICY = "drop_oldest"  # "drop_oldest", "merge" or "fallback_model"
+MAX_MERGED_SEGMENTS = 2  # Longest merged segment under the "merge" policy
+LIVE_SUMMARY = True  # Keep a rolling Gemini summary up to date while recording
+SEARCH_INDEX = True  # Add chunks to the transcript search index (transcript_index.py) as they are written
+SEGMENT_SIDECAR = "segment"  # Timed rows saved next to each transcript: "segment", "word" or None
+LIVE_SUMMARY_INTERVAL = 60  # Seconds between live summary updates
+FALLBACK_MODEL = "small"  # Model switched to under the "fallback_model" policy (single worker)
+ADAPTIVE_LATENCY = False  # Tune the chunk length (and in-process model size) to meet TARGET_LATENCY
+TARGET_LATENCY = 20  # Seconds from speech to its transcript that the adaptive controller aims for
+ADAPTIVE_MIN_CHUNK = 5   # Shortest chunk the controller may choose (seconds)
+ADAPTIVE_MAX_CHUNK = 30  # Longest chunk the controller may choose (seconds)
+ADAPTIVE_LOG = os.path.join("metrics", "adaptive_decisions.jsonl")  # Audit log of the controller's decisions
+# Segments held in memory; must cover the queue, the segment being transcribed
+# and the one being recorded, even when merged (3 minutes)
+CAPTURE_BUFFER_SEGMENTS = (TRANSCRIPTION_QUEUE_SIZE + 1) * MAX_MERGED_SEGMENTS + 2
+METRICS_FILE = os.path.join("metrics", "recorder.prom")  # Prometheus text; use a .json name for JSON
+METRICS_EXPORT_INTERVAL = 10  # Seconds between metrics file updates (None = only at the end)
+
+# Pipeline metrics (see metrics.py), exported to METRICS_FILE
+CAPTURE_BLOCKS = METRICS.counter("capture_blocks_total", "Audio blocks read from the input stream")
+CAPTURE_OVERFLOWS = METRICS.counter("capture_overflows_total", "Input buffers flagged with paInputOverflow (earlier input lost)")
+QUEUE_DEPTH = METRICS.histogram("transcription_queue_depth", "Segments waiting when one is queued", COUNT_BUCKETS)
+CHUNK_QUEUE_SECONDS = METRICS.histogram("chunk_queue_seconds", "Time from a segment being queued to its transcription start")
+CHUNK_CONVERT_SECONDS = METRICS.histogram("chunk_convert_seconds", "Time to convert a segment to float32")
+CHUNK_DECODE_SECONDS = METRICS.histogram("chunk_decode_seconds", "Time to transcribe one segment")
+CHUNK_WRITE_SECONDS = METRICS.histogram("chunk_write_seconds", "Time to append one chunk to the transcript")
+CHUNK_LATENCY_SECONDS = METRICS.histogram("chunk_latency_seconds", "Time from a segment being queued to its text being written")
+CHUNK_REALTIME_FACTOR = METRICS.histogram("chunk_realtime_factor", "Decode time divided by segment duration", RATIO_BUCKETS)
+REALTIME_FACTOR = METRICS.gauge("realtime_factor", "Realtime factor of the most recent segment")
+CHUNK_SECONDS = METRICS.gauge("chunk_seconds", "Segment length currently used for transcription")
+PREPROCESS_SECONDS = METRICS.histogram("preprocess_seconds", "Time to filter and level one input block")
+INPUT_RMS_DBFS = METRICS.gauge("input_rms_dbfs", "RMS level of the latest input block after filtering")
+INPUT_PEAK_DBFS = METRICS.gauge("input_peak_dbfs", "Peak level of the latest input block after filtering")
+AGC_GAIN_DB = METRICS.gauge("agc_gain_db", "Gain applied by the automatic gain control")
+CLIPPED_SAMPLES = METRICS.counter("input_clipped_samples_total", "Input samples at full scale (clipped before capture)")
+ADAPTIVE_DECISIONS = METRICS.counter("adaptive_decisions_total", "Chunk length and model changes made by the adaptive controller")
+
+# Function to load the Whisper model (runs in a background thread)
+def _load_whisper_model():
+    global _model, _model_error
+    try:
+        _model = load_backend(TRANSCRIPTION_BACKEND, WHISPER_MODEL, threads=TRANSCRIPTION_THREADS, **BACKEND_OPTIONS)
+    except ImportError as e:
+        _model_error = f"{e}. Please install the '{TRANSCRIPTION_BACKEND}' backend (e.g. pip install openai-whisper)"
+    except Exception as e:
+        _model_error = f"{e}\nPlease make sure you have enough disk space and a proper internet connection."
+    finally:
+        _model_loaded.set()
+
+# Function to start loading the Whisper model without waiting for it
+def start_model_loading():
+    global _model_thread
+    with _model_thread_lock:
+        if _model_thread is None:
+            print(f"Loading {TRANSCRIPTION_BACKEND} model '{WHISPER_MODEL}' in the background...")
+            _model_thread = threading.Thread(target=_load_whisper_model, daemon=True)
+            _model_thread.start()
+
+# Function to get the Whisper model, waiting for it to load if necessary
+def get_model():
+    start_model_loading()
+    if not _model_loaded.is_set():
+        print("Waiting for the Whisper model to finish loading...")
+        _model_loaded.wait()
+    if _model is None:
+        print(f"Error loading Whisper model: {_model_error}")
+    return _model
 
 # Function to verify if a file was created and contains data
 def verify_file_created(filepath, min_size_bytes=100):
@@ -162,45 +255,217 @@ def save_wav_file(filename, frames, audio_format, channels, rate):
         print(f"Error saving audio file: {e}")
         return False
 
-# Function to record audio and transcribe in real-time
-def record_and_transcribe(audio_filename, transcript_filename, input_device=None):
+# Function to close a streaming WAV writer and verify the file
+def close_wav_file(wf, filename):
     try:
-        audio = pyaudio.PyAudio()
-        
-        # Print available devices for debugging
-        print(list_audio_devices())
-        
-        # Open stream with specific device if provided
-        stream_params = {
-            'format': FORMAT,
-            'channels': CHANNELS,
-            'rate': RATE,
-            'input': True,
-            'frames_per_buffer': CHUNK
-        }
-        
-        if input_device is not None:
-            stream_params['input_device_index'] = input_device
-            
+        wf.close()
+    except Exception as e:
+        print(f"Error saving audio file: {e}")
+        return False
+    
+    if verify_file_created(filename, min_size_bytes=1000):
+        print(f"Audio saved to {filename}")
+        return True
+    else:
+        print(f"Failed to save valid audio file {filename}")
+        return False
+
+# Function to record audio and transcribe in real-time; `source` is any
+# audio_sources.AudioSource and defaults to the microphone. In multi-stream
+# mode `model` is the stream's share of a FairTranscriber, `stream_name`
+# labels its output and `stop_event` ends the recording early. Queued
+# segments are recorded in `journal` (a session_journal.ChunkJournal) so an
+# interrupted session can be resumed. `progress=False` hides the progress bar
+def record_and_transcribe(audio_filename, transcript_filename, input_device=None, on_chunk=None, source=None,
+                          model=None, stream_name=None, stop_event=None, journal=None, progress=True):
+    try:
+        prefix = f"[{stream_name}] " if stream_name else ""  # Labels output from one of several streams
+        
+        # Wait for the in-process model before capture starts, so audio doesn't
+        # pile up while it loads
+        transcription_model = model
+        if transcription_model is None and TRANSCRIPTION_WORKERS == 1:
+            transcription_model = get_model()
+            if transcription_model is None:
+                return False
+        
+        if source is None:
+            # Print available devices for debugging
+            print(list_audio_devices())
+            source = PyAudioSource(RATE, CHANNELS, CHUNK, input_device, FORMAT)
+        
+        # Open the audio source (a specific device if one was provided)
         try:
-            stream = audio.open(**stream_params)
-            print("Audio stream opened successfully!")
+            source.open()
+            print(f"Audio source opened successfully: {source.name}")
         except Exception as e:
             print(f"Error opening audio stream: {e}")
-            print("\nTry specifying a different input device from the list above.")
-            audio.terminate()
+            if isinstance(source, PyAudioSource):
+                print("\nTry specifying a different input device from the list above.")
+            return False
+        if source.rate != RATE or source.channels != CHANNELS or source.sample_width != 2:
+            print(f"Error: {source.name} must deliver {RATE} Hz, {CHANNELS}-channel 16-bit audio")
+            source.close()
+            return False
+        
+        # Open the session audio file (WAV, FLAC or Opus by extension); a
+        # background thread encodes and appends audio as it arrives
+        try:
+            session_wav = open_audio_writer(audio_filename, source.sample_width, CHANNELS, RATE)
+        except Exception as e:
+            print(f"Error creating audio file {audio_filename}: {e}")
+            source.close()
             return False
         
         print(f"Starting recording session for {format_time(RECORD_SECONDS)} (HH:MM:SS)")
-        all_frames = []  # Store all audio frames for the complete recording
-        chunk_frames = []  # Store frames for the current chunk
         
         # Calculate parameters
         total_chunks = int(RATE / CHUNK * RECORD_SECONDS)
         chunks_per_segment = int(RATE / CHUNK * CHUNK_DURATION)
+        segment_samples = chunks_per_segment * CHUNK
+        
+        # The adaptive controller moves the segment length between
+        # ADAPTIVE_MIN_CHUNK and ADAPTIVE_MAX_CHUNK as decode speed changes; it
+        # can only switch models when this stream owns its in-process model
+        controller = None
+        largest_segment = segment_samples
+        if ADAPTIVE_LATENCY:
+            controller = LatencyController(
+                CHUNK_DURATION,
+                WHISPER_MODEL,
+                target_latency=TARGET_LATENCY,
+                min_chunk=ADAPTIVE_MIN_CHUNK,
+                max_chunk=ADAPTIVE_MAX_CHUNK,
+                models=MODEL_LADDER if transcription_model is not None and model is None else (WHISPER_MODEL,),
+                log_file=ADAPTIVE_LOG,
+            )
+            segment_samples = controller.chunk_samples(RATE, CHUNK)
+            largest_segment = max(segment_samples, int(RATE / CHUNK * ADAPTIVE_MAX_CHUNK) * CHUNK)
+        CHUNK_SECONDS.set(segment_samples / RATE)
+        
+        # Fixed-size ring holding the most recent audio; segments are passed
+        # to the transcription thread as (start, end) sample positions
+        capture_buffer = CaptureBuffer.for_segments(largest_segment, CAPTURE_BUFFER_SEGMENTS)
+        segment_start = 0  # Position where the current (unqueued) segment begins
+        final_end = None   # End sample of the session's last segment, set before it is queued
+        
+        # In overlap mode each queued segment also covers the end of the
+        # previous one; duplicated words are removed using word timestamps
+        overlap_samples = int(OVERLAP_SECONDS * RATE) if SEGMENTATION == "fixed" else 0
+        
+        # In "vad" mode segments follow pauses in speech instead of the clock
+        segmenter = None
+        if SEGMENTATION == "vad":
+            segmenter = VadSegmenter(
+                rate=RATE,
+                threshold_db=VAD_THRESHOLD_DB,
+                min_length=VAD_MIN_SEGMENT,
+                max_length=VAD_MAX_SEGMENT,
+                min_silence=VAD_MIN_SILENCE,
+            )
+        
+        # Set once the model or chunk length changes mid-session, after which
+        # the transcript no longer matches any one set of batch settings
+        settings_changed = False
+        
+        # The fallback policy may swap in a smaller model when transcription
+        # can't keep up
+        def switch_to_fallback_model():
+            nonlocal transcription_model, settings_changed
+            print(f"\nTranscription is falling behind; loading fallback model '{FALLBACK_MODEL}'...")
+            load_fallback = lambda: load_backend(
+                TRANSCRIPTION_BACKEND, FALLBACK_MODEL, threads=TRANSCRIPTION_THREADS, **BACKEND_OPTIONS
+            )
+            try:
+                if model is not None:
+                    # A shared model is switched once for every stream
+                    model.switch_model(FALLBACK_MODEL, load_fallback)
+                else:
+                    transcription_model = load_fallback()
+                print(f"\nSwitched transcription to the '{FALLBACK_MODEL}' model")
+                settings_changed = True
+                if controller is not None:
+                    # Keep the adaptive controller's view of the model in step
+                    controller.model_switched(FALLBACK_MODEL)
+            except Exception as e:
+                print(f"\nError loading fallback model: {e}")
         
-        # Create a queue to store audio chunks for transcription
-        audio_queue = queue.Queue()
+        # A smaller model chosen by the adaptive controller is loaded in the
+        # background and swapped in once ready, so decoding carries on
+        # meanwhile.  A larger one is loaded by the transcription thread
+        # after dropping the current model, so the two are never in memory
+        # together; there is headroom, so the queue absorbs the pause.
+        def open_model(name):
+            if name == WHISPER_MODEL and _model is not None:
+                return _model  # The session's own model is still loaded
+            return load_backend(TRANSCRIPTION_BACKEND, name, threads=TRANSCRIPTION_THREADS, **BACKEND_OPTIONS)
+        
+        def load_adaptive_model(name, release_first=False):
+            nonlocal transcription_model
+            previous = controller.model_name
+            if release_first:
+                transcription_model = None
+            try:
+                loaded = open_model(name)
+            except Exception as e:
+                print(f"\n{prefix}Error loading model '{name}': {e}")
+                if transcription_model is None:
+                    try:
+                        transcription_model = open_model(previous)
+                    except Exception as e:
+                        print(f"\n{prefix}Error reloading model '{previous}': {e}")
+                        transcription_model = get_model()
+                controller.model_switched(name, ok=False)
+                return
+            transcription_model = loaded
+            controller.model_switched(name)
+            print(f"\n{prefix}Switched transcription to the '{name}' model")
+        
+        # Apply one of the adaptive controller's decisions (already in ADAPTIVE_LOG)
+        def apply_decision(decision):
+            nonlocal segment_samples, settings_changed
+            ADAPTIVE_DECISIONS.inc()
+            settings_changed = True
+            print(f"\n{prefix}Adaptive: {decision['action']} {decision['from']} -> {decision['to']} ({decision['reason']})")
+            if decision["action"] == "chunk":
+                # Picked up by the recording loop at the next segment boundary
+                segment_samples = controller.chunk_samples(RATE, CHUNK)
+                CHUNK_SECONDS.set(segment_samples / RATE)
+                if segmenter is not None:
+                    segmenter.max_length = max(segmenter.min_length, int(2 * decision["to"] * RATE))
+            elif decision["action"] == "model":
+                ladder = controller.models
+                if ladder.index(decision["to"]) > ladder.index(decision["from"]):
+                    load_adaptive_model(decision["to"], release_first=True)
+                else:
+                    threading.Thread(target=load_adaptive_model, args=(decision["to"],), daemon=True).start()
+        
+        # Bounded queue of segments awaiting transcription; put() never blocks
+        # and OVERLOAD_POLICY decides what to do when it is full
+        audio_queue = ChunkScheduler(
+            maxsize=TRANSCRIPTION_QUEUE_SIZE,
+            policy=OVERLOAD_POLICY,
+            rate=RATE,
+            max_merge_samples=MAX_MERGED_SEGMENTS * largest_segment,
+            on_overload=switch_to_fallback_model,
+        )
+        if stream_name is None:
+            METRICS.gauge("transcription_lag_seconds", "Captured audio not yet transcribed", fn=lambda: audio_queue.lag_seconds)
+            METRICS.gauge("chunks_dropped", "Segments dropped by the overload policy", fn=lambda: audio_queue.stats()["dropped"])
+            METRICS.gauge("chunks_merged", "Segments merged by the overload policy", fn=lambda: audio_queue.stats()["merged"])
+        queued_at = {}   # Segment end sample -> time it was queued
+        chunk_queued = {}  # Chunk number -> time its segment was queued, for end-to-end latency
+        chunk_spans = {}   # Chunk number -> (from, until) seconds of audio its text covers
+        chunk_segments = {}  # Chunk number -> (offset, timed rows) for the segments sidecar
+        chunk_ranges = {}  # Chunk number -> (start, end) samples, marked done in the journal once written
+        
+        # Chunks are added to the search index as they are written
+        search_index = None
+        if SEARCH_INDEX:
+            try:
+                search_index = get_transcript_index()
+            except Exception as e:
+                print(f"Warning: Could not open the transcript search index: {e}")
         
         # Flag to signal the transcription thread to stop
         stop_transcription = threading.Event()
@@ -211,63 +476,221 @@ def record_and_transcribe(audio_filename, transcript_filename, input_device=None
         # Lock for thread-safe operations on the transcription
         transcription_lock = threading.Lock()
         
+        # With several workers, chunks are decoded concurrently in a process pool
+        transcription_pool = None
+        if transcription_model is None and TRANSCRIPTION_WORKERS > 1:
+            print(f"Starting {TRANSCRIPTION_WORKERS} transcription workers...")
+            transcription_pool = TranscriptionPool(
+                TRANSCRIPTION_BACKEND, WHISPER_MODEL, TRANSCRIPTION_WORKERS, **BACKEND_OPTIONS
+            )
+            transcription_pool.warm_up(wait=False)
+        
         # Function to transcribe audio chunks in a separate thread
         def transcribe_chunks():
             chunk_count = 0
+            previous_text = ""  # Prompt context for the next chunk in overlap mode
             
             # Open transcript file and keep it open for appending
             with open(transcript_filename, 'w') as transcript_file:
+                # Whisper's segment timings go to a sidecar next to the transcript
+                segment_writer = None
+                if SEGMENT_SIDECAR:
+                    try:
+                        segment_writer = SegmentWriter(sidecar_path_for(transcript_filename), SEGMENT_SIDECAR)
+                    except Exception as e:
+                        print(f"Warning: Could not create segments file: {e}")
+                
+                # Write a finished chunk to the transcript; OrderedResults calls
+                # this in chunk order even when pool workers finish out of order
+                def write_chunk(number, chunk_text):
+                    if chunk_text is None:
+                        return
+                    
+                    # Append to the complete transcription
+                    with transcription_lock:
+                        all_transcription.append(chunk_text)
+                        
+                        # Write to the transcript file
+                        write_started = time.perf_counter()
+                        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+                        transcript_file.write(f"[Chunk {number} - {timestamp}] {chunk_text}\n\n")
+                        transcript_file.flush()  # Ensure it's written to disk
+                        written = time.perf_counter()
+                        CHUNK_WRITE_SECONDS.observe(written - write_started)
+                        queued = chunk_queued.pop(number, None)
+                        if queued is not None:
+                            CHUNK_LATENCY_SECONDS.observe(written - queued)
+                        written_range = chunk_ranges.pop(number, None)
+                        if journal is not None and written_range is not None:
+                            journal.done(*written_range)
+                    
+                    # Save the timed segments behind the chunk
+                    timed = chunk_segments.pop(number, None)
+                    if segment_writer is not None and timed is not None:
+                        try:
+                            segment_writer.append(number, *timed)
+                        except Exception as e:
+                            print(f"Warning: Could not save segments of chunk {number}: {e}")
+                    
+                    # Make the chunk searchable straight away
+                    span = chunk_spans.pop(number, None)
+                    if search_index is not None and span is not None:
+                        try:
+                            search_index.add_chunk(
+                                transcript_filename, number, timestamp, chunk_text, *span, audio_file=audio_filename
+                            )
+                        except Exception as e:
+                            print(f"Warning: Could not index chunk {number}: {e}")
+                    
+                    # Display the transcription
+                    label = f"{stream_name}, CHUNK {number}" if stream_name else f"CHUNK {number}"
+                    print(f"\n--- LIVE TRANSCRIPTION ({label}) ---")
+                    print(chunk_text)
+                    print("----------------------------------------\n")
+                    
+                    # Let the caller follow along (e.g. the live summariser)
+                    if on_chunk is not None:
+                        try:
+                            on_chunk(number, chunk_text)
+                        except Exception as e:
+                            print(f"Error in chunk callback: {e}")
+                
+                ordered_chunks = OrderedResults(write_chunk)
+                
+                # Record decode time and realtime factor for one segment
+                def record_decode(secs, start, end):
+                    realtime_factor = secs / max(end - start, 1) * RATE
+                    CHUNK_DECODE_SECONDS.observe(secs)
+                    CHUNK_REALTIME_FACTOR.observe(realtime_factor)
+                    REALTIME_FACTOR.set(realtime_factor)
+                    if controller is not None:
+                        # The segment itself still counts towards the lag until it is completed
+                        lag = max(0.0, audio_queue.lag_seconds - (end - start) / RATE)
+                        decision = controller.observe((end - start) / RATE, secs, lag)
+                        if decision is not None:
+                            apply_decision(decision)
+                
+                # Called from the pool when a worker finishes a chunk
+                def finish_pooled_chunk(item, number, future):
+                    try:
+                        _, chunk_text, secs, segments = future.result()
+                        record_decode(secs, *item)
+                        if segments is not None:
+                            chunk_segments[number] = (item[0] / RATE, segments)
+                        ordered_chunks.add(number, chunk_text)
+                    except Exception as e:
+                        print(f"Error transcribing chunk {number}: {e}")
+                        chunk_queued.pop(number, None)
+                        chunk_spans.pop(number, None)
+                        chunk_ranges.pop(number, None)
+                        ordered_chunks.skip(number)
+                    finally:
+                        audio_queue.complete(item)
+                
                 while not stop_transcription.is_set() or not audio_queue.empty():
+                    # Block until a segment is ready; the timeout only bounds
+                    # how long it takes to notice the stop flag
                     try:
-                        if not audio_queue.empty():
-                            # Get the next chunk of audio frames from the queue
-                            chunk_data = audio_queue.get()
-                            chunk_count += 1
-                            
-                            # Save to a temporary file for transcription
-                            temp_filename = f"temp_chunk_{chunk_count}.wav"
-                            with wave.open(temp_filename, 'wb') as wf:
-                                wf.setnchannels(CHANNELS)
-                                wf.setsampwidth(audio.get_sample_size(FORMAT))
-                                wf.setframerate(RATE)
-                                wf.writeframes(b''.join(chunk_data))
-                            
+                        item = audio_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    
+                    dispatched = False
+                    number = None
+                    try:
+                        start, end = item
+                        chunk_count += 1
+                        number = chunk_count
+                        dequeued = time.perf_counter()
+                        queued = queued_at.pop(end, dequeued)
+                        for stale in [position for position in list(queued_at) if position < end]:
+                            queued_at.pop(stale, None)  # Merged into this segment or dropped
+                        CHUNK_QUEUE_SECONDS.observe(dequeued - queued)
+                        
+                        # Convert the int16 view to float32 in memory; Whisper
+                        # accepts 16 kHz arrays directly, so no temp file or ffmpeg
+                        try:
+                            audio_data = pcm16_to_float32(capture_buffer.segment(start, end))
+                            if not capture_buffer.is_valid(start):
+                                raise ValueError("segment was overwritten while being read")
+                            CHUNK_CONVERT_SECONDS.observe(time.perf_counter() - dequeued)
+                        except ValueError as e:
+                            print(f"\n{prefix}Skipping chunk {chunk_count}, transcription fell too far behind: {e}")
+                            ordered_chunks.skip(chunk_count)
+                            continue
+                        
+                        # In overlap mode, keep only the words inside this
+                        # segment's window and carry the text over as context
+                        window = None
+                        options = {}
+                        if overlap_samples:
+                            is_last = end == final_end
+                            window = keep_window(start, end, overlap_samples, RATE, start == 0, is_last)
+                            options["word_timestamps"] = True
+                        if SEGMENT_SIDECAR == "word":
+                            options["word_timestamps"] = True
+                        
+                        print(f"\n{prefix}Transcribing chunk {chunk_count}...")
+                        chunk_queued[chunk_count] = queued
+                        chunk_ranges[chunk_count] = item
+                        keep_from, keep_until = window if window is not None else (0, (end - start) / RATE)
+                        chunk_spans[chunk_count] = (start / RATE + keep_from, start / RATE + keep_until)
+                        if transcription_pool is not None:
+                            # Blocks while every worker is busy, keeping backpressure on the queue;
+                            # chunks run concurrently, so there is no previous text to prompt with
+                            future = transcription_pool.submit(
+                                chunk_count, audio_data, window=window, segment_level=SEGMENT_SIDECAR or None, **options
+                            )
+                            future.add_done_callback(
+                                lambda f, item=item, number=chunk_count: finish_pooled_chunk(item, number, f)
+                            )
+                            dispatched = True
+                        else:
                             # Transcribe the chunk
                             try:
-                                print(f"\nTranscribing chunk {chunk_count}...")
-                                result = model.transcribe(temp_filename)
-                                chunk_text = result["text"].strip()
-                                
-                                # Append to the complete transcription
-                                with transcription_lock:
-                                    all_transcription.append(chunk_text)
-                                    
-                                    # Write to the transcript file
-                                    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                                    transcript_file.write(f"[Chunk {chunk_count} - {timestamp}] {chunk_text}\n\n")
-                                    transcript_file.flush()  # Ensure it's written to disk
-                                
-                                # Display the transcription
-                                print(f"\n--- LIVE TRANSCRIPTION (CHUNK {chunk_count}) ---")
-                                print(chunk_text)
-                                print("----------------------------------------\n")
+                                if window is not None and previous_text:
+                                    options["initial_prompt"] = previous_text
+                                decode_started = time.perf_counter()
+                                result = transcription_model.transcribe(audio_data, **options)
+                                record_decode(time.perf_counter() - decode_started, start, end)
+                                if window is not None:
+                                    chunk_text = text_in_window(result, *window)
+                                else:
+                                    chunk_text = result["text"].strip()
+                                previous_text = chunk_text
+                                if SEGMENT_SIDECAR:
+                                    chunk_segments[chunk_count] = (
+                                        start / RATE,
+                                        segments_in_window(result, *(window or (None, None)), level=SEGMENT_SIDECAR),
+                                    )
+                                ordered_chunks.add(chunk_count, chunk_text)
                             except Exception as e:
-                                print(f"Error transcribing chunk {chunk_count}: {e}")
-                            
-                            # Clean up the temporary file
-                            try:
-                                os.remove(temp_filename)
-                            except:
-                                pass
-                            
-                            # Mark the task as done
-                            audio_queue.task_done()
-                        else:
-                            # No chunks to process, wait a bit
-                            time.sleep(0.5)
+                                print(f"{prefix}Error transcribing chunk {chunk_count}: {e}")
+                                chunk_queued.pop(chunk_count, None)
+                                chunk_spans.pop(chunk_count, None)
+                                chunk_ranges.pop(chunk_count, None)
+                                ordered_chunks.skip(chunk_count)
                     except Exception as e:
                         print(f"Error in transcription thread: {e}")
-                        time.sleep(1)  # Wait a bit before retrying
+                        # The chunk was numbered but never reached a worker, so
+                        # don't let it hold back the chunks after it
+                        if number is not None and not dispatched:
+                            chunk_queued.pop(number, None)
+                            chunk_spans.pop(number, None)
+                            chunk_ranges.pop(number, None)
+                            chunk_segments.pop(number, None)
+                            ordered_chunks.skip(number)
+                    finally:
+                        # Mark the segment as done so lag tracking and join() see it;
+                        # pooled chunks are marked done when their worker finishes
+                        if not dispatched:
+                            audio_queue.complete(item)
+                
+                # Let in-flight chunks finish before the transcript is closed
+                if transcription_pool is not None:
+                    transcription_pool.shutdown(wait=True)
+                if segment_writer is not None:
+                    segment_writer.close()
         
         # Start the transcription thread
         transcription_thread = threading.Thread(target=transcribe_chunks, daemon=True)
@@ -294,36 +717,94 @@ def record_and_transcribe(audio_filename, transcript_filename, input_device=None
                 with transcription_lock:
                     chunk_count = len(all_transcription)
                 
-                print(f"\rRecording: {progress:.1f}% [{bar}] Elapsed: {format_time(elapsed)} Remaining: {format_time(remaining)} | Chunks transcribed: {chunk_count} | Time: {current_time}", end="", flush=True)
+                # How far transcription trails the captured audio
+                lag = audio_queue.lag_seconds
+                
+                print(f"\rRecording: {progress:.1f}% [{bar}] Elapsed: {format_time(elapsed)} Remaining: {format_time(remaining)} | Chunks transcribed: {chunk_count} | Lag: {lag:.0f}s | Time: {current_time}", end="", flush=True)
                 time.sleep(1)  # Update every second
             
             print()  # New line after recording is done
         
-        # Start the progress display thread
-        progress_thread = threading.Thread(target=show_progress, daemon=True)
-        progress_thread.start()
+        # Start the progress display thread; with several streams the caller
+        # shows one combined status line instead
+        if stream_name is None and progress:
+            progress_thread = threading.Thread(target=show_progress, daemon=True)
+            progress_thread.start()
+        
+        # Overflows the source has reported so far (input lost before a block)
+        overflows_seen = source.overflows
+        
+        # Conditions each block for Whisper in preallocated buffers
+        preprocessor = None
+        if PREPROCESS:
+            preprocessor = BlockPreprocessor(
+                RATE, CHUNK, highpass_hz=HIGHPASS_HZ, target_dbfs=AGC_TARGET_DBFS, max_gain_db=AGC_MAX_GAIN_DB
+            )
+        
+        # Segments are queued through here so queue depth and timing are recorded
+        def queue_segment(segment):
+            if journal is not None:
+                journal.queued(*segment)
+            queued_at[segment[1]] = time.perf_counter()
+            audio_queue.put(segment)
+            QUEUE_DEPTH.observe(audio_queue.qsize())
         
         try:
             # Main recording loop
             for i in range(total_chunks):
-                # Read audio data
-                data = stream.read(CHUNK, exception_on_overflow=False)
+                if stop_event is not None and stop_event.is_set():
+                    break
                 
-                # Add to both the complete recording and the current chunk
-                all_frames.append(data)
-                chunk_frames.append(data)
+                # Read audio data; an overflow means earlier input was lost, but
+                # the block returned is intact, so it is only counted
+                data = source.read(CHUNK)
+                if source.overflows != overflows_seen:
+                    CAPTURE_OVERFLOWS.inc(source.overflows - overflows_seen)
+                    overflows_seen = source.overflows
+                if not data:
+                    break  # A file or synthetic source ran out
+                CAPTURE_BLOCKS.inc()
                 
-                # If we've collected a full chunk, send it for transcription
-                if len(chunk_frames) >= chunks_per_segment:
-                    # Add this chunk to the queue for transcription
-                    audio_queue.put(chunk_frames.copy())
-                    
-                    # Clear the chunk frames for the next segment
-                    chunk_frames = []
+                # Filter and level the block for transcription
+                conditioned = data
+                if preprocessor is not None:
+                    preprocess_started = time.perf_counter()
+                    conditioned = preprocessor.process(data)
+                    PREPROCESS_SECONDS.observe(time.perf_counter() - preprocess_started)
+                    if preprocessor.clipped:
+                        CLIPPED_SAMPLES.inc(preprocessor.clipped)
+                    if stream_name is None:
+                        INPUT_RMS_DBFS.set(preprocessor.rms_dbfs)
+                        INPUT_PEAK_DBFS.set(preprocessor.peak_dbfs)
+                        AGC_GAIN_DB.set(preprocessor.gain_db)
+                
+                # Copy into the preallocated ring buffer and hand the raw block
+                # to the WAV writer thread (never blocks on disk I/O)
+                position = capture_buffer.write(conditioned)
+                session_wav.write(data)
+                
+                if segmenter is not None:
+                    # Queue each speech segment as soon as a pause closes it
+                    for segment in segmenter.feed(data):
+                        queue_segment(segment)
+                elif position - segment_start >= segment_samples:
+                    # We've collected a full segment, send it for transcription;
+                    # on the last read it ends the session
+                    if i == total_chunks - 1:
+                        final_end = position
+                    queue_segment((max(0, segment_start - overlap_samples), position))
+                    segment_start = position
                     
-            # Don't forget the last partial chunk if there is one
-            if chunk_frames:
-                audio_queue.put(chunk_frames)
+            # Don't forget the last partial segment if there is one
+            if segmenter is not None:
+                segments = segmenter.flush()
+                if segments:
+                    final_end = segments[-1][1]
+                for segment in segments:
+                    queue_segment(segment)
+            elif capture_buffer.written > segment_start:
+                final_end = capture_buffer.written
+                queue_segment((max(0, segment_start - overlap_samples), capture_buffer.written))
                 
         except KeyboardInterrupt:
             print("\nRecording stopped by user.")
@@ -336,86 +817,440 @@ def record_and_transcribe(audio_filename, transcript_filename, input_device=None
             # Wait for the transcription queue to be emptied
             audio_queue.join()
             
-            # Stop and close the stream
-            stream.stop_stream()
-            stream.close()
-            audio.terminate()
+            # Stop and close the audio source
+            source.close()
             
-            # Save the complete audio recording
-            success = save_wav_file(
-                audio_filename, 
-                all_frames, 
-                audio.get_sample_size(FORMAT), 
-                CHANNELS, 
-                RATE
-            )
+            # Flush the remaining audio and finalise the WAV header
+            success = close_wav_file(session_wav, audio_filename)
             
             # Wait for transcription to finish
             transcription_thread.join(timeout=30)
             
+            # A complete transcript made with one set of settings is recorded
+            # in the batch manifest, so batch_transcribe.py knows what made it
+            stats = audio_queue.stats()
+            if (success and not transcription_thread.is_alive() and not settings_changed
+                    and not stats["dropped"] and not stats["merged"]):
+                record_live_transcript(audio_filename, transcript_filename)
+            
             # Final transcription summary
             with transcription_lock:
                 total_chunks = len(all_transcription)
                 
-            print(f"\nRecording and live transcription complete!")
-            print(f"Total audio chunks transcribed: {total_chunks}")
+            print(f"\n{prefix}Recording and live transcription complete!")
+            print(f"{prefix}Total audio chunks transcribed: {total_chunks}")
+            if segmenter is not None and segmenter.position:
+                skipped = segmenter.skipped_samples / segmenter.position * 100
+                print(f"Silence skipped by VAD: {format_time(segmenter.skipped_samples / RATE)} ({skipped:.0f}% of the recording)")
+            if stats["dropped"] or stats["merged"]:
+                print(f"Overloads: {stats['overloads']} (dropped {stats['dropped']}, merged {stats['merged']} chunks)")
+            if preprocessor is not None and preprocessor.clipped_fraction > 0.001:
+                print(f"{prefix}Input clipped on {preprocessor.clipped_fraction:.1%} of samples; lower the microphone gain")
+            if controller is not None:
+                print(f"{prefix}Adaptive decisions: {controller.decisions} (ended on {controller.chunk_seconds:g}s chunks"
+                      f" with the '{controller.model_name}' model; see {ADAPTIVE_LOG})")
+            # Metrics are process-wide, so with several streams they aren't per-stream
+            if stream_name is None and CAPTURE_OVERFLOWS.value:
+                print(f"Input overflows: {CAPTURE_OVERFLOWS.value} (audio was lost before these blocks)")
+            if stream_name is None and CHUNK_DECODE_SECONDS.count:
+                print(f"Chunk latency p50/p95: {CHUNK_LATENCY_SECONDS.quantile(0.5):.1f}s / {CHUNK_LATENCY_SECONDS.quantile(0.95):.1f}s"
+                      f" | Realtime factor p50/p95: {CHUNK_REALTIME_FACTOR.quantile(0.5):.2f} / {CHUNK_REALTIME_FACTOR.quantile(0.95):.2f}")
             
             return success
     except Exception as e:
         print(f"Error in record_and_transcribe: {e}")
         return False
 
+# Function to start a rolling Gemini summary for a transcript, if possible
+def start_live_summary(transcript_filename):
+    if not LIVE_SUMMARY:
+        return None
+    try:
+        from live_summary import LiveSummarizer
+        if os.environ.get("GEMINI_API_KEY"):
+            return LiveSummarizer(transcript_filename, interval=LIVE_SUMMARY_INTERVAL)
+        print("GEMINI_API_KEY is not set; live summarisation disabled.")
+    except Exception as e:
+        print(f"Warning: Could not start live summarisation: {e}")
+    return None
+
+# Function to finish the live summary, or summarise the completed transcript
+def finish_summary(transcript_filename, live_summarizer):
+    try:
+        summary_text = None
+        if live_summarizer is not None:
+            print("\nFinishing live summary...")
+            summary_text, _ = live_summarizer.finish()
+        if summary_text is None:
+            print("\nAuto-summarising transcript with Gemini...")
+            from summarize import gemini_summarize
+            gemini_summarize(transcript_filename)
+    except Exception as e:
+        print(f"Warning: Auto-summarisation failed: {e}")
+
+# Function to record several streams at once; they share one in-process model
+# through a FairTranscriber. `streams` is a list of (name, audio_filename,
+# transcript_filename, source, on_chunk) tuples; returns {name: success}
+def record_streams(streams):
+    if TRANSCRIPTION_WORKERS > 1:
+        print("Note: multi-stream mode shares one in-process model; TRANSCRIPTION_WORKERS is ignored")
+    shared_model = get_model()
+    if shared_model is None:
+        return {name: False for name, *_ in streams}
+    
+    engine = FairTranscriber(shared_model, WHISPER_MODEL)
+    stop_event = threading.Event()
+    results = {}
+    
+    # Record one stream through its own session on the shared model
+    def run_stream(name, audio_filename, transcript_filename, source, on_chunk):
+        session = engine.session(name)
+        try:
+            results[name] = record_and_transcribe(
+                audio_filename, transcript_filename, on_chunk=on_chunk, source=source,
+                model=session, stream_name=name, stop_event=stop_event,
+            )
+        finally:
+            session.close()
+    
+    threads = [threading.Thread(target=run_stream, args=stream, daemon=True) for stream in streams]
+    for thread in threads:
+        thread.start()
+    
+    start_time = time.time()
+    try:
+        # Show one combined status line until every stream has finished
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+                if thread.is_alive():
+                    break
+            elapsed = format_time(time.time() - start_time)
+            counts = " | ".join(f"{name}: {stats['chunks']} chunks" for name, stats in engine.stats().items())
+            print(f"\rRecording {len(streams)} streams: Elapsed: {elapsed} | {counts}", end="", flush=True)
+        print()
+    except KeyboardInterrupt:
+        print("\nRecording stopped by user.")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        engine.close()
+    
+    for name, stats in engine.stats().items():
+        if stats["chunks"]:
+            print(f"{name}: {stats['chunks']} chunks, {stats['decode_seconds']:.0f}s decoding, "
+                  f"{stats['wait_seconds'] / stats['chunks']:.1f}s average wait for the shared model")
+    return results
+
+# Function to build the audio and transcript filenames for a session
+# starting at `when`, in its month's directories
+def session_filenames(when, suffix=""):
+    month_name = calendar.month_name[when.month]
+    month_dir_audio = os.path.join("saved_audio", f"{when.year}_{month_name}")
+    month_dir_transcription = os.path.join("transcriptions", f"{when.year}_{month_name}")
+    os.makedirs(month_dir_audio, exist_ok=True)
+    os.makedirs(month_dir_transcription, exist_ok=True)
+    base_name = f"{when.strftime('%A')}_{when.strftime('%Y-%m-%d')}_{when.strftime('%H-%M-%S')}{suffix}"
+    audio_extension = ARCHIVE_FORMATS[ARCHIVE_FORMAT][0]
+    return (os.path.join(month_dir_audio, base_name + audio_extension),
+            os.path.join(month_dir_transcription, base_name + ".txt"))
+
+# Function to record a finished live transcript in batch_transcribe.py's
+# manifest with the settings that produced it. Only transcripts under
+# TRANSCRIPTIONS_DIR are recorded (not, say, a benchmark's temp files)
+def record_live_transcript(audio_filename, transcript_filename):
+    transcriptions_dir = os.path.normpath(TRANSCRIPTIONS_DIR)
+    if not os.path.normpath(transcript_filename).startswith(transcriptions_dir + os.sep):
+        return
+    settings = {
+        "backend": TRANSCRIPTION_BACKEND,
+        "model": WHISPER_MODEL,
+        "segmentation": SEGMENTATION,
+        "chunk_duration": CHUNK_DURATION,
+    }
+    try:
+        # Sessions from several devices finish together
+        with _manifest_lock:
+            BatchManifest(os.path.join(transcriptions_dir, MANIFEST_NAME)).record(audio_filename, settings)
+    except Exception as e:
+        print(f"Warning: Could not record {transcript_filename} in the batch manifest: {e}")
+
+# Function to transcribe the chunks that interrupted sessions left queued
+# (see session_journal.py) from their audio files, appending the text to
+# their transcripts. `journals` defaults to every journal in `journal_dir`;
+# pass a list taken before any new session starts so live ones are left alone
+def resume_interrupted_sessions(transcription_model, journal_dir=JOURNAL_DIR, journals=None):
+    if journals is None:
+        journals = find_journals(journal_dir)
+    for journal_file in journals:
+        try:
+            session, pending = read_journal(journal_file)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read {journal_file}: {e}")
+            continue
+        transcript_filename = session["transcript"]
+        if not pending:
+            os.remove(journal_file)
+            continue
+        
+        # Audio that never reached the disk can't be transcribed
+        try:
+            samples, rate = read_audio_samples(session["audio"])
+            if rate != RATE:
+                raise ValueError(f"expected {RATE} Hz audio, got {rate} Hz")
+        except Exception as e:
+            print(f"Warning: Could not resume {transcript_filename} from {session['audio']}: {e}")
+            continue
+        
+        print(f"Resuming {len(pending)} queued chunk(s) of {transcript_filename}...")
+        started = recording_start_time(session["audio"])
+        try:
+            with open(transcript_filename) as f:
+                chunk_count = max((number for number, _, _ in parse_chunks(f.read())), default=0)
+        except FileNotFoundError:
+            chunk_count = 0
+        
+        journal = ChunkJournal(journal_file)
+        finished = True
+        with open(transcript_filename, 'a') as transcript_file:
+            for start, end in pending:
+                audio = samples[start:min(end, len(samples))]
+                if len(audio):
+                    try:
+                        chunk_text = transcription_model.transcribe(pcm16_to_float32(audio))["text"].strip()
+                    except Exception as e:
+                        print(f"Error transcribing queued chunk at {format_time(start / RATE)}: {e}")
+                        finished = False
+                        continue
+                    chunk_count += 1
+                    # Stamp the chunk with when it was spoken, not when it was resumed
+                    timestamp = (started + datetime.timedelta(seconds=start / RATE)).strftime("%H:%M:%S")
+                    transcript_file.write(f"[Chunk {chunk_count} - {timestamp}] {chunk_text}\n\n")
+                    transcript_file.flush()
+                journal.done(start, end)
+        
+        if finished:
+            journal.discard()
+            print(f"Resumed transcription of {transcript_filename}")
+        else:
+            journal.close()
+
+# Function to run as a service: the model and input stream stay open and
+# sessions of RECORD_SECONDS follow each other without losing a sample,
+# until SIGTERM or Ctrl+C. Chunks still queued when a previous run stopped
+# are transcribed alongside the first session
+def run_daemon(input_device=None):
+    if TRANSCRIPTION_WORKERS > 1:
+        print("Note: daemon mode shares one in-process model; TRANSCRIPTION_WORKERS is ignored")
+    shared_model = get_model()
+    if shared_model is None:
+        return False
+    
+    # Sessions overlap while one finishes and the next starts, so they share
+    # the model through a FairTranscriber
+    engine = FairTranscriber(shared_model, WHISPER_MODEL)
+    stop_event = threading.Event()
+    
+    # SIGTERM (e.g. from systemd) ends the current session like Ctrl+C does
+    def request_stop(signum, frame):
+        print("\nStopping; the current session's queued chunks will still be transcribed...")
+        stop_event.set()
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    # The device is read continuously; each session takes the next
+    # RECORD_SECONDS of audio from it
+    capture = ContinuousCapture(PyAudioSource(RATE, CHANNELS, CHUNK, input_device, FORMAT), CHUNK)
+    try:
+        capture.start()
+        print(f"Audio source opened successfully: {capture.name}")
+    except Exception as e:
+        print(f"Error opening audio stream: {e}")
+        engine.close()
+        return False
+    
+    # Catch up on interrupted sessions through the shared model meanwhile;
+    # the journals are listed before the first session creates its own
+    def resume(journals):
+        resume_session = engine.session("resume")
+        try:
+            resume_interrupted_sessions(resume_session, journals=journals)
+        finally:
+            resume_session.close()
+    threading.Thread(target=resume, args=(find_journals(),), daemon=True).start()
+    
+    # Record one session; its journal is kept if it didn't finish cleanly
+    def run_session(name, audio_filename, transcript_filename, source):
+        journal = ChunkJournal.for_session(audio_filename, transcript_filename, RATE)
+        live_summarizer = start_live_summary(transcript_filename)
+        transcriber = engine.session(name)
+        try:
+            success = record_and_transcribe(
+                audio_filename, transcript_filename, source=source, model=transcriber, stop_event=stop_event,
+                journal=journal, on_chunk=live_summarizer.add_chunk if live_summarizer is not None else None,
+                progress=False,  # Sessions overlap at each rollover, so a progress bar per session would clash
+            )
+        finally:
+            transcriber.close()
+        if success:
+            journal.discard()
+            print(f"Session completed successfully. Transcription saved to {transcript_filename}")
+            finish_summary(transcript_filename, live_summarizer)
+        else:
+            journal.close()
+            print(f"Session {transcript_filename} completed with errors.")
+    
+    session_frames = int(RATE / CHUNK * RECORD_SECONDS) * CHUNK
+    sessions = []
+    session_number = 0
+    try:
+        while not stop_event.is_set():
+            session_number += 1
+            audio_filename, transcript_filename = session_filenames(datetime.datetime.now())
+            print(f"\nSession {session_number}: audio will be saved to {audio_filename}, transcription to {transcript_filename}")
+            source = capture.session(session_frames)
+            thread = threading.Thread(
+                target=run_session, args=(f"session{session_number}", audio_filename, transcript_filename, source),
+                daemon=True,
+            )
+            thread.start()
+            sessions.append(thread)
+            
+            # Start the next session as soon as this one has read its last
+            # block; it finishes transcribing in the background
+            while not source.finished.wait(timeout=1):
+                if stop_event.is_set() or not thread.is_alive():
+                    break
+            # Once the device stops delivering audio every further session
+            # would be empty, so stop (a service manager can restart us)
+            if capture.ended and not capture.buffered_frames:
+                if capture.error is not None:
+                    print(f"\nError reading from {capture.name}: {capture.error}")
+                else:
+                    print(f"\n{capture.name} stopped delivering audio; stopping")
+                stop_event.set()
+            elif not source.finished.is_set() and not stop_event.is_set():
+                print("\nRecording session ended early; stopping")
+                stop_event.set()
+            sessions = [session for session in sessions if session.is_alive()]
+    except KeyboardInterrupt:
+        print("\nRecording stopped by user.")
+        stop_event.set()
+    finally:
+        for thread in sessions:
+            thread.join()
+        capture.close()
+        engine.close()
+    return True
+
 # Main function
 def main():
-    # Ask for input device selection
+    parser = argparse.ArgumentParser(description="Record audio with live transcription and summaries.")
+    parser.add_argument("--device", help="Input device index, or several separated by commas (skips the prompt)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Record back-to-back sessions without prompting until stopped (SIGTERM or Ctrl+C)")
+    args = parser.parse_args()
+    
+    # Start loading the model while the user picks a device; pool workers
+    # load their own copies, so there's nothing to warm up in that case
+    if TRANSCRIPTION_WORKERS == 1 or args.daemon:
+        start_model_loading()
+    
+    # Ask for input device selection unless given; several devices are recorded at once
     try:
-        print(list_audio_devices())
-        device_input = input("Enter input device index (leave blank for default): ").strip()
-        input_device = int(device_input) if device_input else None
-        print(f"Using input device: {input_device if input_device is not None else 'Default'}")
+        if args.device is not None or args.daemon:
+            device_input = args.device or ""
+        else:
+            print(list_audio_devices())
+            device_input = input("Enter input device index (leave blank for default, separate several with commas): ").strip()
+        input_devices = [int(index) for index in device_input.split(",") if index.strip()]
+        input_device = input_devices[0] if input_devices else None
+        if len(input_devices) > 1:
+            print(f"Using input devices: {', '.join(map(str, input_devices))}")
+        else:
+            print(f"Using input device: {input_device if input_device is not None else 'Default'}")
     except ValueError:
         print("Invalid input. Using default device.")
+        input_devices = []
         input_device = None
     
+    if args.daemon and len(input_devices) > 1:
+        print("Error: daemon mode records a single input device")
+        sys.exit(1)
+    
     try:
+        # Create the audio/transcription month directories
+        create_month_directories()
+        
         # Generate filenames with current day and date
         current_datetime = datetime.datetime.now()
-        day_name = current_datetime.strftime("%A")
-        date_str = current_datetime.strftime("%Y-%m-%d")
-        timestamp = current_datetime.strftime("%H-%M-%S")
-        month_name = calendar.month_name[current_datetime.month]
-        year = current_datetime.year
-        
-        # Use month-based directory structure
-        month_dir_audio = os.path.join("saved_audio", f"{year}_{month_name}")
-        month_dir_transcription = os.path.join("transcriptions", f"{year}_{month_name}")
-        
-        audio_filename = os.path.join(month_dir_audio, f"{day_name}_{date_str}_{timestamp}.wav")
-        transcript_filename = os.path.join(month_dir_transcription, f"{day_name}_{date_str}_{timestamp}.txt")
         
-        print(f"Starting recording session. Audio will be saved to: {audio_filename}")
-        print(f"Live transcription will be saved to: {transcript_filename}")
+        # Keep the metrics file current while recording
+        if METRICS_FILE and METRICS_EXPORT_INTERVAL:
+            METRICS.start_exporter(METRICS_FILE, METRICS_EXPORT_INTERVAL)
         
-        # Record audio and transcribe in real-time
-        success = record_and_transcribe(audio_filename, transcript_filename, input_device)
-        
-        if success:
-            print(f"Session completed successfully. Transcription saved to {transcript_filename}")
-            # Auto-summarise the completed transcript
-            try:
-                print("\nAuto-summarising transcript with Gemini...")
-                gemini_summarize(transcript_filename)
-            except Exception as e:
-                print(f"Warning: Auto-summarisation failed: {e}")
+        if args.daemon:
+            run_daemon(input_device)
+        elif len(input_devices) > 1:
+            # One audio file, transcript and summary per device
+            streams = []
+            live_summarizers = {}
+            for index in input_devices:
+                name = f"dev{index}"
+                audio_filename, transcript_filename = session_filenames(current_datetime, f"_{name}")
+                print(f"{name}: audio will be saved to {audio_filename}, transcription to {transcript_filename}")
+                live_summarizers[name] = start_live_summary(transcript_filename)
+                on_chunk = live_summarizers[name].add_chunk if live_summarizers[name] is not None else None
+                source = PyAudioSource(RATE, CHANNELS, CHUNK, index, FORMAT)
+                streams.append((name, audio_filename, transcript_filename, source, on_chunk))
+            
+            results = record_streams(streams)
+            
+            for name, _, transcript_filename, _, _ in streams:
+                if results.get(name):
+                    print(f"\n{name}: session completed successfully. Transcription saved to {transcript_filename}")
+                    finish_summary(transcript_filename, live_summarizers[name])
+                else:
+                    print(f"\n{name}: session completed with errors.")
         else:
-            print("Session completed with errors.")
+            audio_filename, transcript_filename = session_filenames(current_datetime)
+            
+            print(f"Starting recording session. Audio will be saved to: {audio_filename}")
+            print(f"Live transcription will be saved to: {transcript_filename}")
+            
+            # Fold chunks into a running summary while recording, so the notes
+            # are ready as soon as the session ends
+            live_summarizer = start_live_summary(transcript_filename)
+            
+            # Record audio and transcribe in real-time
+            success = record_and_transcribe(
+                audio_filename,
+                transcript_filename,
+                input_device,
+                on_chunk=live_summarizer.add_chunk if live_summarizer is not None else None,
+            )
+            
+            if success:
+                print(f"Session completed successfully. Transcription saved to {transcript_filename}")
+                finish_summary(transcript_filename, live_summarizer)
+            else:
+                print("Session completed with errors.")
             
     except KeyboardInterrupt:
         print("\nProgram stopped by user")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    
+    # Write the final metrics, including the summary step
+    if METRICS_FILE:
+        try:
+            METRICS.stop_exporter(METRICS_FILE)
+            print(f"Pipeline metrics saved to {METRICS_FILE}")
+        except Exception as e:
+            print(f"Warning: Could not save metrics: {e}")
         
-    print("\nProgram completed. Run again for another recording session.")
+    if not args.daemon:
+        print("\nProgram completed. Run again for another recording session.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,243 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ---------------------------------------------------------------------------
+# Lightweight pipeline metrics
+# ---------------------------------------------------------------------------
+#
+# Counters, gauges and fixed-bucket histograms that cost well under a
+# microsecond per update, so they can stay on in production.  Everything is
+# registered on the module-level METRICS registry and can be written out as
+# Prometheus text (for node_exporter's textfile collector) or JSON.
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+RATIO_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 4)
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32)
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """A value that is set directly, or read from `fn` at export time."""
+
+    def __init__(self, name, help_text, fn=None):
+        self.name = name
+        self.help = help_text
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value):
+        self.value = value
+
+    def reset(self):
+        self.value = 0.0
+
+    def snapshot(self):
+        if self.fn is not None:
+            try:
+                return self.fn()
+            except Exception:
+                return float("nan")
+        return self.value
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within the bucket that holds it."""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return float("nan")
+        target = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= target and count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return lower + (upper - lower) * (target - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": self.sum,
+                "max": self.max,
+                "buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)),
+            }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._exporter_stop = threading.Event()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+            return metric
+
+    def counter(self, name, help_text=""):
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name, help_text="", fn=None):
+        gauge = self._get(Gauge, name, help_text)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name, help_text="", buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def reset(self):
+        """Zero every metric, e.g. between benchmark runs."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    # -- Export --------------------------------------------------------------
+
+    def to_dict(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        result = {}
+        for metric in metrics:
+            value = metric.snapshot()
+            if isinstance(metric, Histogram):
+                value["p50"] = metric.quantile(0.5)
+                value["p95"] = metric.quantile(0.95)
+            result[metric.name] = value
+        return result
+
+    def to_json(self):
+        def clean(value):
+            if isinstance(value, float) and not math.isfinite(value):
+                return None
+            if isinstance(value, dict):
+                return {k: clean(v) for k, v in value.items()}
+            return value
+
+        return json.dumps({"timestamp": time.time(), "metrics": clean(self.to_dict())}, indent=2)
+
+    def to_prometheus(self):
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            kind = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}[type(metric)]
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            if isinstance(metric, Histogram):
+                snapshot = metric.snapshot()
+                cumulative = 0
+                for bound, count in snapshot["buckets"].items():
+                    cumulative += count
+                    lines.append(f'{metric.name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric.name}_sum {snapshot['sum']}")
+                lines.append(f"{metric.name}_count {snapshot['count']}")
+            else:
+                lines.append(f"{metric.name} {metric.snapshot()}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write all metrics to `path` atomically; .json files get JSON, others Prometheus text."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def start_exporter(self, path, interval=10.0):
+        """Rewrite `path` every `interval` seconds from a background thread."""
+        self.stop_exporter()
+        self._exporter_stop.clear()
+
+        def export():
+            while not self._exporter_stop.wait(interval):
+                try:
+                    self.write(path)
+                except Exception as e:
+                    print(f"\nWarning: could not write metrics to {path}: {e}")
+
+        self._exporter = threading.Thread(target=export, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+    def stop_exporter(self, path=None):
+        """Stop the exporter thread, writing a final snapshot to `path` if given."""
+        if self._exporter is not None:
+            self._exporter_stop.set()
+            self._exporter.join()
+            self._exporter = None
+        if path is not None:
+            self.write(path)
+
+
+METRICS = MetricsRegistry()
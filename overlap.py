@@ -0,0 +1,41 @@
+# ---------------------------------------------------------------------------
+# Overlapping-window helpers
+# ---------------------------------------------------------------------------
+#
+# In overlap mode every segment after the first starts `overlap` seconds
+# before the previous one ended.  Each segment then keeps only the words
+# that start inside its own window, which runs from the middle of the
+# overlap at its start to the middle of the overlap at its end:
+#
+#   segment k    |====overlap====|--------------------|==overlap==|
+#   keeps                  [.....kept.....................)
+#
+# so a word cut by a segment edge is always taken from the neighbouring
+# segment, where it sits well inside the audio.
+
+
+def keep_window(start, end, overlap_samples, rate, is_first, is_last):
+    """
+    Return the (from, until) range, in seconds relative to the segment's
+    first sample, of words that segment [start, end) should keep.
+    """
+    keep_from = 0 if is_first else overlap_samples / 2
+    keep_until = end - start if is_last else end - start - overlap_samples / 2
+    return keep_from / rate, keep_until / rate
+
+
+def text_in_window(result, keep_from, keep_until):
+    """
+    Rebuild the text of a Whisper-style result from the words that start in
+    [keep_from, keep_until).  Falls back to segment start times when the
+    backend didn't return word timestamps.
+    """
+    words = [word for segment in result.get("segments", []) for word in segment.get("words", [])]
+    if words:
+        kept = [word["word"] for word in words if keep_from <= word["start"] < keep_until]
+    else:
+        kept = [
+            segment["text"] for segment in result.get("segments", [])
+            if keep_from <= segment["start"] < keep_until
+        ]
+    return "".join(kept).strip()
@@ -0,0 +1,195 @@
+import math
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Block preprocessing between capture and transcription
+# ---------------------------------------------------------------------------
+#
+# Each block read from the input goes through:
+#
+# 1. A first-order DC-blocking high-pass filter, y[n] = a*y[n-1] + x[n] - x[n-1],
+#    which removes DC offset and low rumble (handling noise, air conditioning)
+#    below `highpass_hz`.  The recursion is evaluated without a per-sample
+#    loop: the block is cut into sub-blocks of SUB_BLOCK samples, each is
+#    filtered from zero state by one matrix product with the filter's
+#    (truncated) impulse response, and the state carried into each sub-block
+#    is added back with a second, much smaller matrix product.
+# 2. Automatic gain control towards `target_dbfs`, never boosting by more
+#    than `max_gain_db` and never boosting blocks below `gate_dbfs`, so
+#    silence isn't raised into hiss.  The gain falls quickly and rises
+#    slowly, is ramped across each block to avoid clicks, and is capped so
+#    the block's peak stays below full scale.
+# 3. Block statistics: RMS and peak level (dBFS) and the number of input
+#    samples at full scale, i.e. clipped by the microphone or its preamp.
+#
+# All work happens in buffers allocated once for the block size.
+
+SUB_BLOCK = 64
+FULL_SCALE = 32768.0
+SILENCE_DBFS = -120.0
+
+
+def to_dbfs(level):
+    """Convert a linear level (1.0 = full scale) to dBFS."""
+    return 20.0 * math.log10(level) if level > 0 else SILENCE_DBFS
+
+
+class BlockPreprocessor:
+    """
+    Condition 16-bit mono blocks of up to `block_frames` samples for
+    transcription.  `process` returns an int16 array that is reused by the
+    next call, so copy it (CaptureBuffer.write does) before processing the
+    next block.  Pass `highpass_hz=None` or `max_gain_db=None` to turn the
+    filter or the AGC off.  The stats of the last block are in `rms_dbfs`,
+    `peak_dbfs` and `clipped`; `clipped_samples` is the running total.
+    """
+
+    def __init__(self, rate=16000, block_frames=1024, highpass_hz=80.0, target_dbfs=-20.0, max_gain_db=20.0,
+                 gate_dbfs=-50.0, attack=0.5, release=0.05):
+        self.rate = rate
+        self.block_frames = block_frames
+        self.highpass_hz = highpass_hz
+        self.target_rms = 10 ** (target_dbfs / 20)
+        self.max_gain = 10 ** (max_gain_db / 20) if max_gain_db is not None else None
+        self.gate_rms = 10 ** (gate_dbfs / 20)
+        self.attack = attack    # Fraction of the way to a lower gain moved per block
+        self.release = release  # Fraction of the way to a higher gain moved per block
+
+        self.gain = 1.0
+        self.rms_dbfs = SILENCE_DBFS
+        self.peak_dbfs = SILENCE_DBFS
+        self.clipped = 0
+        self.clipped_samples = 0
+        self.samples = 0
+
+        # Work buffers, padded to whole sub-blocks
+        sub_blocks = -(-block_frames // SUB_BLOCK)
+        padded = sub_blocks * SUB_BLOCK
+        self._x = np.zeros(padded + 1, dtype=np.float32)  # Previous block's last sample, then this block
+        self._diff = np.zeros(padded, dtype=np.float32)
+        self._y = np.zeros(padded, dtype=np.float32)
+        self._carry = np.zeros(sub_blocks, dtype=np.float32)
+        self._carry_in = np.zeros(sub_blocks, dtype=np.float32)
+        self._scratch = np.zeros(padded, dtype=np.float32)
+        self._full_scale = np.zeros(block_frames, dtype=bool)
+        self._negative_scale = np.zeros(block_frames, dtype=bool)
+        self._ramp = np.zeros(block_frames, dtype=np.float32)
+        self._steps = np.arange(1, block_frames + 1, dtype=np.float32)
+        self._out = np.zeros(block_frames, dtype=np.int16)
+        self._state = 0.0  # Filter output at the end of the previous block
+
+        if highpass_hz is not None:
+            a = math.exp(-2.0 * math.pi * highpass_hz / rate)
+            lags = np.arange(SUB_BLOCK)
+            # Zero-state response inside a sub-block: y = d @ _impulse
+            self._impulse = np.triu(a ** (lags[None, :] - lags[:, None]).clip(min=0)).astype(np.float32)
+            # Decay of the carried-in state across a sub-block
+            self._decay = (a ** (lags + 1)).astype(np.float32)
+            # State entering sub-block k from sub-block ends j < k
+            steps = np.arange(sub_blocks)
+            a_sub = a ** SUB_BLOCK
+            self._carry_matrix = np.tril(a_sub ** (steps[:, None] - steps[None, :] - 1).clip(min=0), k=-1)
+            self._carry_matrix = self._carry_matrix.astype(np.float32)
+            self._carry_decay = (a_sub ** steps).astype(np.float32)
+
+    def reset(self):
+        self.gain = 1.0
+        self._x[0] = 0.0
+        self._state = 0.0
+
+    def process(self, data):
+        """Filter, level and measure one block of int16 PCM (bytes or array)."""
+        samples = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.int16)
+        n = samples.shape[0]
+        if n > self.block_frames:
+            raise ValueError(f"Block of {n} samples is larger than block_frames={self.block_frames}")
+        padded = -(-n // SUB_BLOCK) * SUB_BLOCK
+        x = self._x[1:n + 1]
+        np.multiply(samples, 1.0 / FULL_SCALE, out=x, casting="unsafe")
+
+        # Clipping is measured on the input, before any gain
+        full_scale = self._full_scale[:n]
+        # Both rails; np.abs would wrap int16 -32768 back to -32768
+        np.greater_equal(samples, 32767, out=full_scale)
+        negative = self._negative_scale[:n]
+        np.less_equal(samples, -32767, out=negative)
+        full_scale |= negative
+        self.clipped = int(np.count_nonzero(full_scale))
+        self.clipped_samples += self.clipped
+        self.samples += n
+
+        if self.highpass_hz is not None:
+            y = self._filter(n, padded)
+        else:
+            y = x
+        self._x[0] = self._x[n]
+
+        # Levels of the filtered block
+        peak = float(np.max(np.abs(y))) if n else 0.0
+        rms = math.sqrt(float(np.dot(y, y)) / n) if n else 0.0
+        self.peak_dbfs = to_dbfs(peak)
+        self.rms_dbfs = to_dbfs(rms)
+
+        if self.max_gain is not None and n:
+            y = self._apply_gain(y, rms, peak)
+
+        out = self._out[:n]
+        np.multiply(y, FULL_SCALE, out=y)
+        np.clip(y, -FULL_SCALE, FULL_SCALE - 1, out=y)
+        np.rint(y, out=y)
+        out[:] = y
+        return out
+
+    def _filter(self, n, padded):
+        # Differentiate (the filter's zero at DC), padding with zeros so the
+        # block splits into whole sub-blocks; padding only follows the real
+        # samples, so it can't affect them
+        diff = self._diff[:padded]
+        np.subtract(self._x[1:n + 1], self._x[:n], out=diff[:n])
+        diff[n:] = 0.0
+        sub_blocks = padded // SUB_BLOCK
+        d = diff.reshape(sub_blocks, SUB_BLOCK)
+        y = self._y[:padded].reshape(sub_blocks, SUB_BLOCK)
+        np.matmul(d, self._impulse, out=y)
+
+        # State entering each sub-block: earlier sub-blocks' zero-state ends
+        # plus the previous block's state, decayed
+        carry = self._carry[:sub_blocks]
+        np.matmul(self._carry_matrix[:sub_blocks, :sub_blocks], y[:, -1], out=carry)
+        carry_in = self._carry_in[:sub_blocks]
+        np.multiply(self._carry_decay[:sub_blocks], self._state, out=carry_in)
+        carry += carry_in
+        scratch = self._scratch[:padded].reshape(sub_blocks, SUB_BLOCK)
+        np.multiply(carry[:, None], self._decay[None, :], out=scratch)
+        y += scratch
+
+        filtered = self._y[:n]
+        self._state = float(filtered[-1]) if n else self._state
+        return filtered
+
+    def _apply_gain(self, y, rms, peak):
+        n = y.shape[0]
+        previous = self.gain
+        if rms >= self.gate_rms:
+            wanted = min(self.target_rms / rms, self.max_gain)
+            rate = self.attack if wanted < self.gain else self.release
+            self.gain += (wanted - self.gain) * rate
+        # Never push the peak past full scale, from the block's first sample
+        if peak > 0:
+            self.gain = min(self.gain, 0.99 / peak)
+            previous = min(previous, self.gain)
+        # Linear ramp from the previous gain to the new one across the block
+        ramp = self._ramp[:n]
+        np.multiply(self._steps[:n], (self.gain - previous) / n, out=ramp)
+        ramp += previous
+        np.multiply(y, ramp, out=y)
+        return y
+
+    @property
+    def gain_db(self):
+        return to_dbfs(self.gain)
+
+    @property
+    def clipped_fraction(self):
+        return self.clipped_samples / self.samples if self.samples else 0.0
@@ -0,0 +1,289 @@
+import argparse
+import os
+import struct
+import sys
+import threading
+import wave
+
+import numpy as np
+
+from audio_archive import archive_format_for, import_soundfile, open_wav_samples
+
+# ---------------------------------------------------------------------------
+# Timestamped segment sidecar
+# ---------------------------------------------------------------------------
+#
+# Next to each transcript X.txt the recorder writes X.segments, holding the
+# start/end of every Whisper segment (or word) in seconds from the start of
+# the session audio, plus its text.  The file is a header followed by one
+# block per chunk, each stored column by column:
+#
+#     header: b"SEGS", uint16 version, uint16 level (0 = segment, 1 = word)
+#     block:  uint32 count, uint32 chunk number,
+#             float64[count] starts, float64[count] ends,
+#             uint32[count] text byte lengths, UTF-8 text
+#
+# Blocks are appended and flushed as chunks are written, so a crash loses
+# at most the chunk being written; a truncated last block is ignored.
+
+SEGMENTS_EXTENSION = ".segments"
+LEVELS = ("segment", "word")
+_MAGIC = b"SEGS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_BLOCK_HEADER = struct.Struct("<II")
+
+
+def sidecar_path_for(transcript_file):
+    """transcriptions/2024_April/X.txt -> transcriptions/2024_April/X.segments"""
+    return os.path.splitext(transcript_file)[0] + SEGMENTS_EXTENSION
+
+
+def segments_in_window(result, keep_from=None, keep_until=None, level="segment"):
+    """
+    Return [(start, end, text)] from a Whisper-style result, in seconds
+    relative to the chunk, keeping only entries that start inside
+    [keep_from, keep_until) when a window is given (see overlap.keep_window).
+    At "word" level the words are used when the backend returned them.
+    """
+    segments = result.get("segments", [])
+    entries = segments
+    if level == "word":
+        words = [word for segment in segments for word in segment.get("words", [])]
+        if words:
+            entries = [{"start": w["start"], "end": w["end"], "text": w["word"]} for w in words]
+    rows = []
+    for entry in entries:
+        if keep_from is not None and not keep_from <= entry["start"] < keep_until:
+            continue
+        text = entry["text"].strip()
+        if text:
+            rows.append((float(entry["start"]), float(entry["end"]), text))
+    return rows
+
+
+class SegmentWriter:
+    """Append chunk blocks to a .segments sidecar; safe to call from several threads."""
+
+    def __init__(self, path, level="segment"):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown segment level {level!r}; expected one of {', '.join(LEVELS)}")
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, LEVELS.index(level)))
+        self._file.flush()
+
+    def append(self, chunk_number, offset, rows):
+        """
+        Write one chunk's rows.  `rows` are (start, end, text) relative to the
+        chunk; `offset` is the chunk's start in seconds into the session audio.
+        """
+        texts = [text.encode('utf-8') for _, _, text in rows]
+        starts = np.array([start for start, _, _ in rows], dtype='<f8') + offset
+        ends = np.array([end for _, end, _ in rows], dtype='<f8') + offset
+        lengths = np.array([len(text) for text in texts], dtype='<u4')
+        block = b"".join((
+            _BLOCK_HEADER.pack(len(rows), chunk_number),
+            starts.tobytes(), ends.tobytes(), lengths.tobytes(), *texts,
+        ))
+        with self._lock:
+            self._file.write(block)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SegmentStore:
+    """
+    The segments of one session, loaded from its sidecar into columns:
+    `starts` and `ends` (float64 seconds), `chunks` (chunk number per row)
+    and `texts`.  Rows are sorted by start time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is not a segments file")
+        magic, version, level = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} segments file")
+        self.level = LEVELS[level]
+
+        starts, ends, chunks, texts = [], [], [], []
+        pos = _HEADER.size
+        while pos + _BLOCK_HEADER.size <= len(data):
+            count, chunk_number = _BLOCK_HEADER.unpack_from(data, pos)
+            columns_end = pos + _BLOCK_HEADER.size + count * 20
+            if columns_end > len(data):
+                break
+            block_starts = np.frombuffer(data, '<f8', count, pos + _BLOCK_HEADER.size)
+            block_ends = np.frombuffer(data, '<f8', count, pos + _BLOCK_HEADER.size + count * 8)
+            lengths = np.frombuffer(data, '<u4', count, pos + _BLOCK_HEADER.size + count * 16)
+            text_end = columns_end + int(lengths.sum())
+            if text_end > len(data):
+                break  # Cut off by a crash
+            offset = columns_end
+            for length in lengths.tolist():
+                texts.append(data[offset:offset + length].decode('utf-8'))
+                offset += length
+            starts.append(block_starts)
+            ends.append(block_ends)
+            chunks.append(np.full(count, chunk_number, dtype=np.uint32))
+            pos = text_end
+
+        self.starts = np.concatenate(starts) if starts else np.zeros(0)
+        self.ends = np.concatenate(ends) if ends else np.zeros(0)
+        self.chunks = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint32)
+        order = np.argsort(self.starts, kind="stable")
+        self.starts, self.ends, self.chunks = self.starts[order], self.ends[order], self.chunks[order]
+        self.texts = [texts[i] for i in order.tolist()]
+
+    @classmethod
+    def for_transcript(cls, transcript_file):
+        return cls(sidecar_path_for(transcript_file))
+
+    def __len__(self):
+        return self.starts.shape[0]
+
+    def __getitem__(self, index):
+        return self.starts[index], self.ends[index], self.texts[index]
+
+    def at(self, seconds):
+        """Index of the row playing at `seconds` (or the last one before it), or None."""
+        index = int(np.searchsorted(self.starts, seconds, side="right")) - 1
+        return index if index >= 0 else None
+
+    def between(self, start, end):
+        """Indices of the rows that overlap [start, end)."""
+        return np.nonzero((self.starts < end) & (self.ends > start))[0].tolist()
+
+    def find(self, text):
+        """Indices of the rows whose text contains `text` (case-insensitive)."""
+        needle = text.lower()
+        return [i for i, row_text in enumerate(self.texts) if needle in row_text.lower()]
+
+
+# ---------------------------------------------------------------------------
+# Audio clip extraction
+# ---------------------------------------------------------------------------
+
+
+class SessionAudio:
+    """
+    Random access to a session recording.  WAV files are memory-mapped, so
+    a clip costs the same whatever its position in the file; FLAC files are
+    read through libsndfile's seek table.  Opus has no cheap seek and is
+    decoded into memory when opened.
+    """
+
+    def __init__(self, audio_file):
+        self.audio_file = audio_file
+        self.format = archive_format_for(audio_file)
+        self._samples = None
+        self._sound_file = None
+        self._lock = threading.Lock()
+        if self.format == "wav":
+            self._samples, self.rate = open_wav_samples(audio_file)
+        else:
+            self._sound_file = import_soundfile().SoundFile(audio_file)
+            self.rate = self._sound_file.samplerate
+            if self._sound_file.channels != 1:
+                raise ValueError(f"{audio_file} must be mono, got {self._sound_file.channels} channels")
+            if self.format == "opus":
+                self._samples = self._sound_file.read(dtype='int16')
+                self._sound_file.close()
+                self._sound_file = None
+
+    def clip(self, start, end):
+        """Return the int16 samples between `start` and `end` seconds."""
+        first = max(0, int(start * self.rate))
+        last = max(first, int(round(end * self.rate)))
+        if self._samples is not None:
+            return self._samples[first:last]
+        with self._lock:
+            self._sound_file.seek(min(first, self._sound_file.frames))
+            return self._sound_file.read(last - first, dtype='int16')
+
+    def save_clip(self, start, end, filename):
+        """Write the span between `start` and `end` seconds to a WAV file."""
+        samples = np.ascontiguousarray(self.clip(start, end), dtype='<i2')
+        with wave.open(filename, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(samples.tobytes())
+
+    def close(self):
+        if self._sound_file is not None:
+            self._sound_file.close()
+            self._sound_file = None
+        self._samples = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List the timed segments of a transcript and extract the audio behind them."
+    )
+    parser.add_argument("transcript", help="Transcript .txt file (its .segments sidecar is read)")
+    parser.add_argument("--find", help="Only show segments containing this text")
+    parser.add_argument("--clip", type=int, metavar="INDEX", help="Save the audio of segment INDEX")
+    parser.add_argument("--audio", help="Session audio file (default: found from the transcript path)")
+    parser.add_argument("--padding", type=float, default=0.25, help="Seconds of audio around a clip")
+    parser.add_argument("-o", "--output", default="clip.wav")
+    args = parser.parse_args()
+
+    try:
+        store = SegmentStore.for_transcript(args.transcript)
+    except (OSError, ValueError) as e:
+        print(f"Error reading segments for {args.transcript}: {e}")
+        sys.exit(1)
+
+    if args.clip is None:
+        indices = store.find(args.find) if args.find else range(len(store))
+        for i in indices:
+            start, end, text = store[i]
+            print(f"{i:5d}  {start:9.2f} - {end:9.2f}  (chunk {store.chunks[i]})  {text}")
+        return
+
+    if not 0 <= args.clip < len(store):
+        print(f"No segment {args.clip}; the transcript has {len(store)}")
+        sys.exit(1)
+    audio_file = args.audio
+    if audio_file is None:
+        from transcript_index import audio_path_for
+        audio_file = audio_path_for(args.transcript)
+    if audio_file is None:
+        print("Could not find the session audio; pass it with --audio")
+        sys.exit(1)
+
+    start, end, text = store[args.clip]
+    with SessionAudio(audio_file) as audio:
+        audio.save_clip(max(0.0, start - args.padding), end + args.padding, args.output)
+    print(f"Saved {end - start:.1f}s of {audio_file} to {args.output}: {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import datetime
+import glob
+import json
+import os
+import threading
+
+# ---------------------------------------------------------------------------
+# On-disk journal of queued chunks
+# ---------------------------------------------------------------------------
+#
+# The transcription queue only holds (start, end) sample positions into the
+# session audio, which is itself streamed to disk while recording.  The
+# journal records those positions as segments are queued and again once
+# their text has been written, so after a crash or restart the chunks that
+# were still waiting can be transcribed from the audio file:
+#
+#     {"audio": ..., "transcript": ..., "rate": 16000, "started": ...}
+#     {"queued": [start, end]}
+#     {"done": [start, end]}
+#
+# A session that finishes normally deletes its journal.
+
+JOURNAL_DIR = "spool"
+JOURNAL_EXTENSION = ".journal"
+
+
+def journal_path_for(transcript_file, journal_dir=JOURNAL_DIR):
+    """transcriptions/2024_April/X.txt -> spool/X.journal"""
+    name = os.path.splitext(os.path.basename(transcript_file))[0]
+    return os.path.join(journal_dir, name + JOURNAL_EXTENSION)
+
+
+class ChunkJournal:
+    """
+    Append-only journal for one session; safe to call from several threads.
+    With a `session` header dict a new journal is started, otherwise
+    entries are appended to the existing one at `path`.
+    """
+
+    def __init__(self, path, session=None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, 'w' if session is not None else 'a')
+        if session is not None:
+            self._append(session)
+        elif self._file.tell() and not _ends_with_newline(path):
+            self._file.write("\n")  # Don't extend a line cut off by a crash
+
+    @classmethod
+    def for_session(cls, audio_file, transcript_file, rate, journal_dir=JOURNAL_DIR):
+        return cls(journal_path_for(transcript_file, journal_dir), {
+            "audio": audio_file,
+            "transcript": transcript_file,
+            "rate": rate,
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        })
+
+    def _append(self, entry):
+        # One short line per segment; flushed to the OS but not fsynced, so
+        # the capture loop never waits for the disk
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(entry) + "\n")
+                self._file.flush()
+
+    def queued(self, start, end):
+        self._append({"queued": [start, end]})
+
+    def done(self, start, end):
+        self._append({"done": [start, end]})
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """Close and delete the journal once every chunk has been written."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def read_journal(path):
+    """
+    Return (session, pending) for a journal file: the header dict and the
+    queued (start, end) ranges no finished range covers, oldest first.  A
+    line cut off by a crash is ignored.
+    """
+    session, queued, done = None, [], []
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if session is None:
+                session = entry
+            elif "queued" in entry:
+                queued.append(tuple(entry["queued"]))
+            elif "done" in entry:
+                done.append(tuple(entry["done"]))
+    if session is None or "audio" not in session:
+        raise ValueError(f"{path} is not a chunk journal")
+    # Merged segments finish as one range covering several queued ones
+    pending = [
+        (start, end) for start, end in queued
+        if not any(done_start <= start and end <= done_end for done_start, done_end in done)
+    ]
+    return session, sorted(set(pending))
+
+
+def find_journals(journal_dir=JOURNAL_DIR):
+    """Journals left behind by sessions that did not finish, oldest first."""
+    return sorted(glob.glob(os.path.join(journal_dir, "*" + JOURNAL_EXTENSION)), key=os.path.getmtime)
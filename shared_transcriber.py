@@ -0,0 +1,159 @@
+import collections
+import threading
+import time
+
+# ---------------------------------------------------------------------------
+# One model shared fairly between several recording streams
+# ---------------------------------------------------------------------------
+
+
+class _Request:
+    __slots__ = ("audio", "options", "queued", "done", "result", "error")
+
+    def __init__(self, audio, options):
+        self.audio = audio
+        self.options = options
+        self.queued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FairTranscriber:
+    """
+    Serve transcription requests from several streams with a single model.
+
+    Each stream gets a session (see `session`) whose `transcribe` method
+    looks like a backend's, so record_and_transcribe can use it in place
+    of its own model.  One decode thread owns the model and takes requests
+    round-robin across streams with work waiting, so a busy stream cannot
+    starve the others, and only one copy of the model is held in memory.
+    """
+
+    def __init__(self, model, model_name=None):
+        self.model = model
+        self.model_name = model_name
+        self._pending = {}                   # Stream name -> deque of _Request
+        self._order = collections.deque()    # Round-robin order of stream names
+        self._stats = {}
+        self._cond = threading.Condition()
+        self._switch_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="shared-transcriber", daemon=True)
+        self._thread.start()
+
+    def session(self, name):
+        """Register a stream and return its session."""
+        with self._cond:
+            if name in self._pending:
+                raise ValueError(f"Stream {name!r} is already registered")
+            self._pending[name] = collections.deque()
+            self._order.append(name)
+            self._stats[name] = {"chunks": 0, "decode_seconds": 0.0, "wait_seconds": 0.0, "errors": 0}
+        return TranscriberSession(self, name)
+
+    def _submit(self, name, audio, options):
+        request = _Request(audio, options)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Shared transcriber has been closed")
+            self._pending[name].append(request)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _next_request(self):
+        # Called with the condition held; the chosen stream goes to the back
+        for _ in range(len(self._order)):
+            name = self._order[0]
+            self._order.rotate(-1)
+            if self._pending[name]:
+                return name, self._pending[name].popleft()
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                name, request = self._next_request()
+                while request is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    name, request = self._next_request()
+                model = self.model
+
+            started = time.perf_counter()
+            try:
+                request.result = model.transcribe(request.audio, **request.options)
+            except Exception as e:
+                request.error = e
+            finished = time.perf_counter()
+
+            with self._cond:
+                stats = self._stats[name]
+                stats["chunks"] += 1
+                stats["decode_seconds"] += finished - started
+                stats["wait_seconds"] += started - request.queued
+                if request.error is not None:
+                    stats["errors"] += 1
+            request.done.set()
+
+    def _remove(self, name):
+        with self._cond:
+            # Anything still queued for the stream is abandoned by its caller
+            for request in self._pending.pop(name, ()):
+                request.error = RuntimeError(f"Stream {name!r} was closed")
+                request.done.set()
+            if name in self._order:
+                self._order.remove(name)
+
+    def switch_model(self, model_name, load):
+        """
+        Replace the shared model with `load()` unless `model_name` is already
+        in use.  Safe to call from several streams at once; the model is
+        loaded only once and requests already running finish on the old one.
+        """
+        with self._switch_lock:
+            if self.model_name == model_name:
+                return False
+            model = load()
+            with self._cond:
+                self.model = model
+                self.model_name = model_name
+            return True
+
+    def stats(self):
+        """Per-stream counters: chunks, decode_seconds, wait_seconds and errors."""
+        with self._cond:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TranscriberSession:
+    """A stream's handle on a FairTranscriber; usable wherever a backend is."""
+
+    def __init__(self, engine, name):
+        self.engine = engine
+        self.name = name
+
+    def transcribe(self, audio, **options):
+        return self.engine._submit(self.name, audio, options)
+
+    def switch_model(self, model_name, load):
+        return self.engine.switch_model(model_name, load)
+
+    def close(self):
+        self.engine._remove(self.name)
@@ -1,11 +1,25 @@
-from google import genai
 import os
 import sys
 import re
+import time
+import random
 import datetime
 import calendar
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+from metrics import METRICS
+from summary_cache import SummaryCache
+
+# The Gemini client talks HTTP through httpx; its connect/read timeouts and
+# dropped connections are raised as httpx.TransportError subclasses
+try:
+    import httpx
+    TRANSPORT_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+except ImportError:
+    TRANSPORT_ERRORS = (ConnectionError, TimeoutError)
+
 # Load variables from .env file
 load_dotenv()
 
@@ -18,6 +32,38 @@ SUMMARY_PROMPT = (
     "with key points and takeaways:\n\n"
 )
 
+# Transcripts longer than MAP_REDUCE_THRESHOLD characters are summarised in
+# windows of WINDOW_CHUNKS transcript chunks, which are then combined
+MAP_REDUCE_THRESHOLD = 60000
+WINDOW_CHUNKS = 40           # 10 minutes of 15-second chunks
+REDUCE_FANIN = 20            # Partial summaries combined per reduce request
+WINDOW_PROMPT = (
+    "Summarize this part of a longer lecture/lesson transcript into concise "
+    "notes with key points:\n\n"
+)
+REDUCE_PROMPT = (
+    "The following are notes on consecutive parts of one lecture/lesson. "
+    "Combine them into a single set of concise notes with key points and "
+    "takeaways:\n\n"
+)
+SUMMARY_WORKERS = 4          # Concurrent requests in batch mode
+REQUESTS_PER_MINUTE = 15     # Token-bucket rate limit shared by all workers
+MAX_RETRIES = 4              # Retries per transcript on transient API errors
+RETRY_BACKOFF = 2.0          # Initial retry delay in seconds, doubled each attempt
+
+SUMMARY_CACHE_PATH = os.path.join("summaries", ".summary_cache.sqlite")
+SUMMARY_CACHE_MAX_ENTRIES = 5000  # Least recently used summaries beyond this are evicted
+
+# HTTP status codes worth retrying (timeouts, rate limiting, server errors)
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Pipeline metrics (see metrics.py)
+GEMINI_REQUEST_SECONDS = METRICS.histogram("gemini_request_seconds", "Latency of successful Gemini API requests")
+GEMINI_RETRIES = METRICS.counter("gemini_retries_total", "Gemini requests retried after a transient error")
+SUMMARY_CACHE_HITS = METRICS.counter("summary_cache_hits_total", "Summaries served from the summary cache")
+SUMMARY_CACHE_MISSES = METRICS.counter("summary_cache_misses_total", "Summaries that needed a Gemini request")
+SUMMARIZE_SECONDS = METRICS.histogram("summarize_seconds", "Time to summarise one transcript end to end")
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -47,63 +93,277 @@ def extract_date_from_filename(filename):
     return now.year, now.month, now.day
 
 
-# ---------------------------------------------------------------------------
-# Gemini summarisation
-# ---------------------------------------------------------------------------
-
-def gemini_summarize(transcript_file):
+def summary_path_for(transcript_file):
     """
-    Read a transcript file, send it to the Gemini API for summarisation,
-    and save the result to the summaries directory.
+    Return the summary path for a transcript, creating its date directory.
+    """
+    year, month, day = extract_date_from_filename(transcript_file)
+    summary_dir = create_summary_directory(year, month, day)
+    original_name = os.path.splitext(os.path.basename(transcript_file))[0]
+    return os.path.join(summary_dir, f"{original_name}_summary.txt")
 
-    Returns (summary_text, output_path) on success, or (None, None) on failure.
+
+# Timestamp headers written by the recorder (e.g. "[Chunk 3 - 12:34:56]")
+CHUNK_HEADER = re.compile(r'\[Chunk \d+ - \d+:\d+:\d+\]\s*')
+
+
+def read_transcript(transcript_file):
+    """
+    Read a transcript file.
+    Returns its text, or None if the file is missing or empty.
     """
-    # --- Read the transcript ------------------------------------------------
     try:
         with open(transcript_file, 'r') as f:
             full_text = f.read()
     except FileNotFoundError:
         print(f"Error: File {transcript_file} not found.")
-        return None, None
+        return None
 
     if not full_text.strip():
         print(f"Warning: Transcript file {transcript_file} is empty. Skipping.")
-        return None, None
+        return None
+
+    return full_text
+
+
+def clean_transcript(full_text):
+    """Strip the chunk timestamp headers from a transcript."""
+    return CHUNK_HEADER.sub('', full_text)
+
+
+def split_transcript_chunks(full_text):
+    """
+    Split a transcript on its chunk headers and return the text of each
+    chunk (headers stripped, empty chunks dropped).
+    """
+    return [chunk.strip() for chunk in CHUNK_HEADER.split(full_text) if chunk.strip()]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to
+    `capacity`.  acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+# Caps the Gemini requests in flight across every thread: batch workers each
+# run their own map-reduce pool, which would otherwise multiply the limit
+_request_slots = threading.BoundedSemaphore(SUMMARY_WORKERS)
+
+
+def get_summary_cache():
+    """Return the shared on-disk summary cache, opening it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SummaryCache(SUMMARY_CACHE_PATH, max_entries=SUMMARY_CACHE_MAX_ENTRIES)
+        return _default_cache
+
+
+def cache_key(text, prompt=SUMMARY_PROMPT):
+    return SummaryCache.make_key(text, GEMINI_MODEL, prompt)
 
-    # Strip timestamp headers (e.g. "[Chunk 3 - 12:34:56]")
-    clean_text = re.sub(r'\[Chunk \d+ - \d+:\d+:\d+\]\s*', '', full_text)
 
-    # --- Call Gemini API ----------------------------------------------------
-    api_key = os.environ.get("GEMINI_API_KEY")
+def is_transient_error(error):
+    """True for errors worth retrying: rate limits, server errors, network failures."""
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    # google.genai.errors.APIError carries the HTTP status in `code`
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code in TRANSIENT_STATUS_CODES
+
+
+# ---------------------------------------------------------------------------
+# Gemini summarisation
+# ---------------------------------------------------------------------------
+
+def create_client(api_key=None):
+    """
+    Create a Gemini client from GEMINI_API_KEY (or the given key).
+    Returns None if no key is configured.
+    """
+    api_key = api_key or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         print("Error: GEMINI_API_KEY environment variable is not set. Skipping summarisation.")
-        return None, None
+        return None
 
-    try:
-        client = genai.Client(api_key=api_key)
+    from google import genai
+    return genai.Client(api_key=api_key)
 
-        print(f"Sending transcript to Gemini ({GEMINI_MODEL}) for summarisation...")
-        response = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=SUMMARY_PROMPT + clean_text,
-        )
-        summary_text = response.text
-    except Exception as e:
-        print(f"Error calling Gemini API: {e}")
-        return None, None
 
-    # --- Save the summary ---------------------------------------------------
-    year, month, day = extract_date_from_filename(transcript_file)
-    summary_dir = create_summary_directory(year, month, day)
+def request_summary(client, clean_text, rate_limiter=None, max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF,
+                    prompt=SUMMARY_PROMPT):
+    """
+    Ask Gemini for a summary of `clean_text` using `prompt`, retrying transient errors with
+    exponential backoff and jitter.  `client` is anything with a
+    models.generate_content(model=..., contents=...) method, so a local fake
+    can stand in for the real API.  Raises the last error on failure.
+    """
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            with _request_slots:
+                started = time.perf_counter()
+                response = client.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt + clean_text,
+                )
+                GEMINI_REQUEST_SECONDS.observe(time.perf_counter() - started)
+            return response.text
+        except Exception as e:
+            if attempt == max_retries or not is_transient_error(e):
+                raise
+            GEMINI_RETRIES.inc()
+            delay = backoff * (2 ** attempt) * (0.5 + random.random())
+            print(f"Transient Gemini error ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def lazy_client(client=None):
+    """
+    Return a thread-safe function that returns `client`, creating it from
+    GEMINI_API_KEY the first time it is needed.  Fully cached runs never
+    call it, so they need no API key.
+    """
+    lock = threading.Lock()
+
+    def get_client():
+        nonlocal client
+        with lock:
+            if client is None:
+                client = create_client()
+                if client is None:
+                    raise RuntimeError("GEMINI_API_KEY is not set")
+            return client
+
+    return get_client
+
+
+def cached_summary(get_client, text, prompt, cache, rate_limiter=None):
+    """
+    Summarise `text` with `prompt`, using the cache when possible.
+    Returns (summary_text, from_cache).
+    """
+    key = cache_key(text, prompt)
+    summary_text = cache.get(key)
+    if summary_text is not None:
+        SUMMARY_CACHE_HITS.inc()
+        return summary_text, True
+    SUMMARY_CACHE_MISSES.inc()
+    summary_text = request_summary(get_client(), text, rate_limiter=rate_limiter, prompt=prompt)
+    cache.put(key, summary_text)
+    return summary_text, False
 
-    original_name = os.path.splitext(os.path.basename(transcript_file))[0]
-    output_file = os.path.join(summary_dir, f"{original_name}_summary.txt")
 
+def summarize_transcript_text(full_text, get_client, cache, rate_limiter=None, max_workers=SUMMARY_WORKERS):
+    """
+    Summarise a transcript's text.
+
+    Short transcripts go to Gemini in a single request.  Longer ones are
+    split into windows of WINDOW_CHUNKS chunks along the [Chunk N] headers;
+    the windows are summarised concurrently (map) and their notes combined
+    (reduce, hierarchically if there are many).  Windows are aligned to
+    chunk numbers and cached individually, so when chunks are appended only
+    the last window and the reduce step are sent again.
+
+    Returns (summary_text, api_requests).
+    """
+    clean_text = clean_transcript(full_text)
+    chunks = split_transcript_chunks(full_text)
+    windows = ["\n\n".join(chunks[i:i + WINDOW_CHUNKS]) for i in range(0, len(chunks), WINDOW_CHUNKS)]
+    if len(clean_text) <= MAP_REDUCE_THRESHOLD or len(windows) < 2:
+        summary_text, from_cache = cached_summary(get_client, clean_text, SUMMARY_PROMPT, cache, rate_limiter)
+        return summary_text, 0 if from_cache else 1
+
+    requests = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Map: notes for every window, in order
+        results = list(executor.map(
+            lambda window: cached_summary(get_client, window, WINDOW_PROMPT, cache, rate_limiter), windows
+        ))
+        requests += sum(1 for _, from_cache in results if not from_cache)
+        partials = [summary for summary, _ in results]
+
+        # Reduce: combine the notes REDUCE_FANIN at a time until one is left
+        def reduce_group(group):
+            if len(group) == 1:
+                return group[0], True
+            return cached_summary(get_client, "\n\n---\n\n".join(group), REDUCE_PROMPT, cache, rate_limiter)
+
+        while len(partials) > 1:
+            groups = [partials[i:i + REDUCE_FANIN] for i in range(0, len(partials), REDUCE_FANIN)]
+            results = list(executor.map(reduce_group, groups))
+            requests += sum(1 for _, from_cache in results if not from_cache)
+            partials = [summary for summary, _ in results]
+
+    return partials[0], requests
+
+
+def save_summary(output_file, summary_text):
     try:
         with open(output_file, 'w') as f:
             f.write(summary_text)
     except Exception as e:
         print(f"Error saving summary file: {e}")
+        return False
+    return True
+
+
+def gemini_summarize(transcript_file, client=None, cache=None):
+    """
+    Read a transcript file, send it to the Gemini API for summarisation,
+    and save the result to the summaries directory.  A transcript that was
+    summarised before with the same model and prompt is served from the
+    summary cache without calling the API.
+
+    Returns (summary_text, output_path) on success, or (None, None) on failure.
+    """
+    # --- Read the transcript ------------------------------------------------
+    full_text = read_transcript(transcript_file)
+    if full_text is None:
+        return None, None
+
+    # --- Call Gemini API (or the cache) -------------------------------------
+    if cache is None:
+        cache = get_summary_cache()
+
+    try:
+        print(f"Sending transcript to Gemini ({GEMINI_MODEL}) for summarisation...")
+        with SUMMARIZE_SECONDS.time():
+            summary_text, requests = summarize_transcript_text(full_text, lazy_client(client), cache)
+    except Exception as e:
+        print(f"Error calling Gemini API: {e}")
+        return None, None
+    if requests == 0:
+        print(f"Using cached summary for {transcript_file}")
+
+    # --- Save the summary ---------------------------------------------------
+    output_file = summary_path_for(transcript_file)
+    if not save_summary(output_file, summary_text):
         return None, None
 
     print(f"Summary saved to: {output_file}")
@@ -120,29 +380,78 @@ def gemini_summarize(transcript_file):
 # Batch mode
 # ---------------------------------------------------------------------------
 
-def summarize_all_transcripts(transcriptions_dir="transcriptions"):
-    """
-    Find and summarise all transcript files in the transcriptions directory.
-    """
+def find_transcripts(transcriptions_dir="transcriptions"):
     transcript_files = []
     for root, _, files in os.walk(transcriptions_dir):
         for file in files:
             if file.endswith(".txt") and not file.endswith("_summary.txt"):
                 transcript_files.append(os.path.join(root, file))
+    return sorted(transcript_files)
+
+
+def summarize_all_transcripts(transcriptions_dir="transcriptions", client=None, max_workers=SUMMARY_WORKERS,
+                              requests_per_minute=REQUESTS_PER_MINUTE, cache=None):
+    """
+    Find and summarise all transcript files in the transcriptions directory.
+
+    Files are summarised concurrently by `max_workers` threads sharing one
+    client and one token-bucket rate limit of `requests_per_minute`.
+    Transcripts found in the summary cache are not sent to the API.
+    Returns a list of (transcript_file, output_file or None, seconds).
+    """
+    transcript_files = find_transcripts(transcriptions_dir)
 
     if not transcript_files:
         print(f"No transcript files found in {transcriptions_dir}")
-        return
+        return []
+
+    if cache is None:
+        cache = get_summary_cache()
+    hits_before, misses_before = cache.hits, cache.misses
+
+    # The client is only created once a transcript misses the cache
+    get_client = lazy_client(client)
 
     print(f"Found {len(transcript_files)} transcript files")
     print("-" * 40)
 
-    for i, tf in enumerate(transcript_files):
-        print(f"Processing file {i+1}/{len(transcript_files)}: {tf}")
-        gemini_summarize(tf)
-        print("-" * 40)
+    rate_limiter = TokenBucket(requests_per_minute / 60.0)
+
+    def summarize_one(transcript_file):
+        start = time.perf_counter()
+        full_text = read_transcript(transcript_file)
+        if full_text is None:
+            return None, time.perf_counter() - start
+        summary_text, _ = summarize_transcript_text(full_text, get_client, cache, rate_limiter=rate_limiter)
+        output_file = summary_path_for(transcript_file)
+        if not save_summary(output_file, summary_text):
+            output_file = None
+        return output_file, time.perf_counter() - start
+
+    results = []
+    batch_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(summarize_one, tf): tf for tf in transcript_files}
+        for i, future in enumerate(as_completed(futures)):
+            tf = futures[future]
+            try:
+                output_file, elapsed = future.result()
+            except Exception as e:
+                output_file, elapsed = None, 0.0
+                print(f"[{i+1}/{len(transcript_files)}] Error summarising {tf}: {e}")
+            else:
+                status = f"-> {output_file}" if output_file else "skipped"
+                print(f"[{i+1}/{len(transcript_files)}] {elapsed:6.1f}s {tf} {status}")
+            results.append((tf, output_file, elapsed))
+
+    total = time.perf_counter() - batch_start
+    succeeded = sum(1 for _, output_file, _ in results if output_file)
+    print("-" * 40)
+    print(f"Summarised {succeeded}/{len(transcript_files)} transcripts in {total:.1f}s "
+          f"({succeeded / total * 60 if total else 0:.1f} per minute)")
+    print(f"Summary cache: {cache.hits - hits_before} hits, {cache.misses - misses_before} misses")
 
-    print("All transcripts have been summarised!")
+    return results
 
 
 # ---------------------------------------------------------------------------
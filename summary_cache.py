@@ -0,0 +1,88 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# ---------------------------------------------------------------------------
+# Persistent summary cache
+# ---------------------------------------------------------------------------
+
+
+class SummaryCache:
+    """
+    On-disk cache of Gemini summaries keyed by a hash of the request.
+
+    The key covers the model, the prompt and the cleaned transcript text, so
+    changing any of them is a miss and everything else is served from disk.
+    Entries live in a single SQLite file; when there are more than
+    `max_entries`, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by every thread, serialised by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " key TEXT PRIMARY KEY,"
+                " summary TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries (last_used)")
+
+    @staticmethod
+    def make_key(text, model, prompt):
+        digest = hashlib.sha256()
+        for part in (model, prompt, text):
+            encoded = part.encode("utf-8")
+            # Length-prefix each part so different splits can't collide
+            digest.update(len(encoded).to_bytes(8, "little"))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached summary for `key`, or None (counted as a miss)."""
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key, summary):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                " SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
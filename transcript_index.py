@@ -0,0 +1,332 @@
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+TRANSCRIPTIONS_DIR = "transcriptions"
+AUDIO_DIR = "saved_audio"
+INDEX_PATH = os.path.join(TRANSCRIPTIONS_DIR, ".transcript_index.sqlite")
+CHUNK_DURATION = 15  # Seconds per chunk, used to estimate offsets for files indexed after the fact
+AUDIO_EXTENSIONS = (".wav", ".flac", ".opus")
+
+# One chunk: "[Chunk N - HH:MM:SS] text", up to the next header
+CHUNK_PATTERN = re.compile(r'\[Chunk (\d+) - (\d+:\d+:\d+)\][ \t]*(.*?)(?=\n\[Chunk \d+ - \d+:\d+:\d+\]|\Z)', re.S)
+
+
+def parse_chunks(text):
+    """Return (number, timestamp, text) for every non-empty chunk in a transcript."""
+    chunks = []
+    for match in CHUNK_PATTERN.finditer(text):
+        chunk_text = match.group(3).strip()
+        if chunk_text:
+            chunks.append((int(match.group(1)), match.group(2), chunk_text))
+    return chunks
+
+
+def audio_path_for(transcript_file, transcriptions_dir=TRANSCRIPTIONS_DIR, audio_dir=AUDIO_DIR):
+    """transcriptions/2024_April/X.txt -> saved_audio/2024_April/X.wav (or .flac/.opus), or None."""
+    relative = os.path.splitext(os.path.relpath(transcript_file, transcriptions_dir))[0]
+    for extension in AUDIO_EXTENSIONS:
+        candidate = os.path.join(audio_dir, relative + extension)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def fts_query(query):
+    """Quote every term of a free-text query so FTS5 operators in it are taken literally."""
+    terms = re.findall(r'\w+', query)
+    return " ".join(f'"{term}"' for term in terms)
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+class TranscriptIndex:
+    """
+    SQLite FTS5 index over transcript chunks.
+
+    Each row is one `[Chunk N - HH:MM:SS]` entry with its session, chunk
+    number and offset in the session audio.  The recorder adds chunks live
+    as they are written (with exact offsets); `update` catches up with files
+    on disk, reading only what was appended since the last run and
+    re-indexing files that were rewritten.  Offsets of chunks indexed from
+    files are estimated as (N - 1) * CHUNK_DURATION.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by every thread, serialised by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id INTEGER PRIMARY KEY,"
+                " transcript TEXT UNIQUE NOT NULL,"
+                " audio TEXT,"
+                " mtime REAL NOT NULL DEFAULT 0,"
+                " size INTEGER NOT NULL DEFAULT 0,"
+                " indexed_bytes INTEGER NOT NULL DEFAULT 0,"
+                " prefix_hash TEXT NOT NULL DEFAULT '')"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " id INTEGER PRIMARY KEY,"
+                " session_id INTEGER NOT NULL REFERENCES sessions (id),"
+                " number INTEGER NOT NULL,"
+                " timestamp TEXT NOT NULL,"
+                " start REAL NOT NULL,"
+                " end REAL NOT NULL,"
+                " exact INTEGER NOT NULL,"
+                " UNIQUE (session_id, number))"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunk_text USING fts5(text, tokenize='porter unicode61')"
+            )
+
+    def _session_id(self, transcript_file, audio_file=None):
+        # Called with the lock held, inside a transaction
+        transcript_file = os.path.normpath(transcript_file)
+        row = self._conn.execute("SELECT id, audio FROM sessions WHERE transcript = ?", (transcript_file,)).fetchone()
+        if row is not None:
+            if audio_file and row[1] != audio_file:
+                self._conn.execute("UPDATE sessions SET audio = ? WHERE id = ?", (audio_file, row[0]))
+            return row[0]
+        cursor = self._conn.execute(
+            "INSERT INTO sessions (transcript, audio) VALUES (?, ?)", (transcript_file, audio_file)
+        )
+        return cursor.lastrowid
+
+    def _insert_chunks(self, session_id, chunks):
+        # chunks: (number, timestamp, text, start, end, exact); returns how many were new
+        added = 0
+        for number, timestamp, text, start, end, exact in chunks:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO chunks (session_id, number, timestamp, start, end, exact)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, number, timestamp, start, end, int(exact)),
+            )
+            if cursor.rowcount:
+                self._conn.execute("INSERT INTO chunk_text (rowid, text) VALUES (?, ?)", (cursor.lastrowid, text))
+                added += 1
+        return added
+
+    def add_chunk(self, transcript_file, number, timestamp, text, start, end, audio_file=None):
+        """Index one chunk as the recorder writes it; `start`/`end` are seconds into the audio."""
+        with self._lock, self._conn:
+            session_id = self._session_id(transcript_file, audio_file)
+            self._insert_chunks(session_id, [(number, timestamp, text, start, end, True)])
+
+    def _remove_session_chunks(self, session_id):
+        self._conn.execute(
+            "DELETE FROM chunk_text WHERE rowid IN (SELECT id FROM chunks WHERE session_id = ?)", (session_id,)
+        )
+        self._conn.execute("DELETE FROM chunks WHERE session_id = ?", (session_id,))
+
+    def update_file(self, transcript_file, audio_file=None):
+        """
+        Bring one transcript up to date.  Returns the number of chunks added
+        (0 if the file is unchanged).
+        """
+        stat = os.stat(transcript_file)
+        key = os.path.normpath(transcript_file)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, mtime, size, indexed_bytes, prefix_hash FROM sessions WHERE transcript = ?", (key,)
+            ).fetchone()
+        if row is not None and row[1] == stat.st_mtime and row[2] == stat.st_size:
+            return 0
+
+        with open(transcript_file, 'rb') as f:
+            data = f.read()
+        # Appended to since the last update, or rewritten (e.g. by batch_transcribe)?
+        # Sessions only indexed live so far have no verified prefix, so the
+        # whole file is re-read: it may have been rewritten since
+        indexed_bytes = row[3] if row is not None else 0
+        appended = (
+            indexed_bytes > 0
+            and len(data) >= indexed_bytes
+            and hashlib.sha1(data[:indexed_bytes]).hexdigest() == row[4]
+        )
+        new_data = data[indexed_bytes:] if appended else data
+        chunks = parse_chunks(new_data.decode('utf-8', errors='replace'))
+
+        with self._lock, self._conn:
+            session_id = self._session_id(transcript_file, audio_file)
+            exact = {}
+            if row is not None and not appended:
+                # Chunks the recorder added keep their exact offsets, as long
+                # as their text is unchanged
+                exact = {
+                    (number, text): (start, end)
+                    for number, text, start, end in self._conn.execute(
+                        "SELECT chunks.number, chunk_text.text, chunks.start, chunks.end"
+                        " FROM chunks JOIN chunk_text ON chunk_text.rowid = chunks.id"
+                        " WHERE chunks.session_id = ? AND chunks.exact",
+                        (session_id,),
+                    )
+                }
+                self._remove_session_chunks(session_id)
+            rows = []
+            for number, timestamp, text in chunks:
+                if (number, text) in exact:
+                    rows.append((number, timestamp, text, *exact.pop((number, text)), True))
+                else:
+                    start, end = (number - 1) * CHUNK_DURATION, number * CHUNK_DURATION
+                    rows.append((number, timestamp, text, start, end, False))
+            # Re-inserted live chunks aren't new
+            added = self._insert_chunks(session_id, rows) - sum(1 for chunk in rows if chunk[5])
+            self._conn.execute(
+                "UPDATE sessions SET mtime = ?, size = ?, indexed_bytes = ?, prefix_hash = ? WHERE id = ?",
+                (stat.st_mtime, stat.st_size, len(data), hashlib.sha1(data).hexdigest(), session_id),
+            )
+        return added
+
+    def update(self, transcriptions_dir=TRANSCRIPTIONS_DIR, audio_dir=AUDIO_DIR):
+        """
+        Index every transcript under `transcriptions_dir` that is new or has
+        changed, and drop sessions whose file was deleted.
+        Returns (files_updated, chunks_added).
+        """
+        seen = set()
+        files_updated = chunks_added = 0
+        for root, _, files in os.walk(transcriptions_dir):
+            for file in sorted(files):
+                if not file.endswith(".txt"):
+                    continue
+                transcript_file = os.path.join(root, file)
+                seen.add(os.path.normpath(transcript_file))
+                try:
+                    added = self.update_file(transcript_file, audio_path_for(transcript_file, transcriptions_dir, audio_dir))
+                except OSError as e:
+                    print(f"Skipping {transcript_file}: {e}")
+                    continue
+                if added:
+                    files_updated += 1
+                    chunks_added += added
+
+        prefix = os.path.normpath(transcriptions_dir) + os.sep
+        with self._lock, self._conn:
+            for session_id, transcript in self._conn.execute("SELECT id, transcript FROM sessions").fetchall():
+                if transcript.startswith(prefix) and transcript not in seen:
+                    self._remove_session_chunks(session_id)
+                    self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        return files_updated, chunks_added
+
+    def search(self, query, limit=20, raw=False):
+        """
+        Return the best-matching chunks for `query`, best first, as dicts with
+        transcript, audio, chunk, timestamp, start, end, exact and snippet.
+        The query is taken as plain words unless `raw` is set, in which case
+        FTS5 syntax (phrases, OR, NEAR, prefix*) is allowed.
+        """
+        match = query if raw else fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.transcript, s.audio, c.number, c.timestamp, c.start, c.end, c.exact,"
+                "       snippet(chunk_text, 0, '[', ']', '...', 12)"
+                " FROM chunk_text"
+                " JOIN chunks c ON c.id = chunk_text.rowid"
+                " JOIN sessions s ON s.id = c.session_id"
+                " WHERE chunk_text MATCH ?"
+                " ORDER BY bm25(chunk_text)"
+                " LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        keys = ("transcript", "audio", "chunk", "timestamp", "start", "end", "exact", "snippet")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            sessions = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        return {"sessions": sessions, "chunks": chunks}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_transcript_index():
+    """Return the shared transcript index at INDEX_PATH, opening it on first use."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = TranscriptIndex(INDEX_PATH)
+        return _default_index
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+
+def format_offset(seconds):
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the transcript archive.")
+    parser.add_argument("query", nargs="*", help="Words to search for (omit with --update to only index)")
+    parser.add_argument("--index", default=INDEX_PATH, help=f"Index file (default: {INDEX_PATH})")
+    parser.add_argument("--transcriptions-dir", default=TRANSCRIPTIONS_DIR)
+    parser.add_argument("--audio-dir", default=AUDIO_DIR)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 as is (phrases, OR, NEAR, prefix*)")
+    parser.add_argument("--no-update", action="store_true", help="Search without indexing new transcripts first")
+    args = parser.parse_args()
+
+    index = TranscriptIndex(args.index)
+    if not args.no_update:
+        start = time.perf_counter()
+        files, chunks = index.update(args.transcriptions_dir, args.audio_dir)
+        if files:
+            print(f"Indexed {chunks} new chunks from {files} transcripts in {time.perf_counter() - start:.1f}s")
+    if not args.query:
+        stats = index.stats()
+        print(f"Index holds {stats['chunks']} chunks from {stats['sessions']} sessions")
+        return
+
+    try:
+        start = time.perf_counter()
+        hits = index.search(" ".join(args.query), limit=args.limit, raw=args.raw)
+        elapsed = time.perf_counter() - start
+    except sqlite3.OperationalError as e:
+        print(f"Invalid query: {e}")
+        sys.exit(1)
+
+    for hit in hits:
+        offset = format_offset(hit["start"]) + ("" if hit["exact"] else " (approx.)")
+        audio = hit["audio"] or "audio not found"
+        print(f"{hit['transcript']}  chunk {hit['chunk']} [{hit['timestamp']}]")
+        print(f"    {audio} @ {offset}")
+        print(f"    {hit['snippet']}")
+    print(f"{len(hits)} hits in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
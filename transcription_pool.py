@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backends import load_backend
+from overlap import text_in_window
+from segment_store import segments_in_window
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+# Backend loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(backend, model_name, threads, backend_options):
+    global _worker_model
+    _worker_model = load_backend(backend, model_name, threads=threads, **backend_options)
+
+
+def _worker_ready():
+    return os.getpid()
+
+
+def _transcribe_in_worker(index, audio, options, window, segment_level):
+    start = time.perf_counter()
+    result = _worker_model.transcribe(audio, **options)
+    text = text_in_window(result, *window) if window is not None else result["text"].strip()
+    segments = None
+    if segment_level is not None:
+        segments = segments_in_window(result, *(window or (None, None)), level=segment_level)
+    return index, text, time.perf_counter() - start, segments
+
+
+# ---------------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------------
+
+
+class TranscriptionPool:
+    """
+    Transcribe chunks concurrently in `workers` processes, each holding its
+    own copy of the model, loaded through `load_backend` exactly as the
+    in-process path does.  Each worker gets an equal share of the CPU
+    threads unless `threads_per_worker` says otherwise.
+
+    `submit` blocks once `max_in_flight` chunks are pending, so a caller
+    pulling from a bounded queue keeps its backpressure instead of piling
+    audio up inside the executor.
+    """
+
+    def __init__(self, backend, model_name, workers, threads_per_worker=None, max_in_flight=None, **backend_options):
+        if workers < 1:
+            raise ValueError(f"Need at least one worker, got {workers}")
+        self.workers = workers
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        # spawn, not fork: torch's and CTranslate2's thread pools don't survive fork
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(backend, model_name, threads, backend_options),
+        )
+        self._slots = threading.BoundedSemaphore(max_in_flight or workers)
+
+    def warm_up(self, wait=True):
+        """Start every worker and load its model ahead of the first chunk."""
+        futures = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def submit(self, index, audio, window=None, segment_level=None, **options):
+        """
+        Queue a float32 chunk for transcription.  The returned future resolves
+        to (index, text, decode_seconds, segments).  With `window` (see
+        overlap.keep_window) only the words starting inside it are kept.
+        `segments` is None unless `segment_level` ("segment" or "word") asks
+        for the timed rows of segment_store.segments_in_window.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_transcribe_in_worker, index, audio, options, window, segment_level)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# In-order delivery of out-of-order results
+# ---------------------------------------------------------------------------
+
+
+class OrderedResults:
+    """
+    Reorder results that complete out of order.  `emit(index, value)` is
+    called exactly once per index, in increasing index order, as soon as all
+    earlier indices have arrived.  Use `skip` for indices that will never
+    produce a result so later ones aren't held back.
+    """
+
+    def __init__(self, emit, first_index=1):
+        self._emit = emit
+        self._next = first_index
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, index, value):
+        with self._lock:
+            self._pending[index] = value
+            while self._next in self._pending:
+                self._emit(self._next, self._pending.pop(self._next))
+                self._next += 1
+
+    def skip(self, index):
+        self.add(index, None)
+
+    @property
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,138 @@
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Frame energy
+# ---------------------------------------------------------------------------
+
+
+def frame_energy_db(samples, frame_samples):
+    """
+    RMS level in dBFS of each complete `frame_samples`-long frame of int16
+    samples, computed in one vectorized pass.  Trailing samples that don't
+    fill a frame are ignored.
+    """
+    n_frames = samples.shape[0] // frame_samples
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[:n_frames * frame_samples].reshape(n_frames, frame_samples).astype(np.float32)
+    mean_square = np.einsum('ij,ij->i', frames, frames) / frame_samples
+    return 10.0 * np.log10(mean_square / (32768.0 * 32768.0) + 1e-10)
+
+
+# ---------------------------------------------------------------------------
+# Streaming voice-activity segmenter
+# ---------------------------------------------------------------------------
+
+
+class VadSegmenter:
+    """
+    Split a stream of int16 audio into speech segments for transcription.
+
+    Audio is analysed in `frame_seconds` frames; a frame is speech when its
+    level is above `threshold_db` dBFS.  A segment is cut once the speaker
+    pauses for `min_silence` seconds and the segment is at least
+    `min_length` seconds long (or after `flush_silence` seconds of silence
+    regardless of length).  Segments are never longer than `max_length`;
+    when that limit is reached the cut is placed at the quietest frame in the
+    last part of the segment rather than mid-word.  Silent spans between
+    segments are never emitted, so Whisper doesn't spend time on them.
+
+    Segments are (start, end) absolute sample positions, counted from the
+    first sample fed in, so they line up with CaptureBuffer positions.
+    """
+
+    def __init__(self, rate=16000, threshold_db=-45.0, min_length=3.0, max_length=30.0,
+                 min_silence=0.6, flush_silence=2.0, padding=0.2, frame_seconds=0.032):
+        if not 0 < min_length <= max_length:
+            raise ValueError(f"Need 0 < min_length <= max_length, got {min_length} and {max_length}")
+        self.rate = rate
+        self.threshold_db = threshold_db
+        self.frame_samples = max(1, int(rate * frame_seconds))
+        self.min_length = int(rate * min_length)
+        self.max_length = int(rate * max_length)
+        self.min_silence = int(rate * min_silence)
+        self.flush_silence = int(rate * flush_silence)
+        self.padding = int(rate * padding)
+
+        self.position = 0           # Samples analysed so far
+        self.speech_samples = 0     # Samples inside emitted segments
+        self._carry = np.empty(0, dtype=np.int16)
+        self._segment_start = None  # Start of the open segment, if any
+        self._last_speech_end = 0   # End of the most recent speech frame
+        self._last_emitted_end = 0
+        self._energies = []         # Per-frame levels of the open segment
+
+    @property
+    def skipped_samples(self):
+        """Samples analysed that fell outside every emitted segment."""
+        return self.position - self.speech_samples - self._open_length()
+
+    def _open_length(self):
+        return 0 if self._segment_start is None else self.position - self._segment_start
+
+    def feed(self, data):
+        """
+        Analyse the next block of audio (bytes or int16 array) and return the
+        list of segments completed by it.
+        """
+        samples = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.int16)
+        if self._carry.shape[0]:
+            samples = np.concatenate((self._carry, samples))
+        usable = samples.shape[0] // self.frame_samples * self.frame_samples
+        self._carry = samples[usable:].copy()
+
+        segments = []
+        levels = frame_energy_db(samples[:usable], self.frame_samples)
+        for level in levels.tolist():
+            frame_start = self.position
+            self.position += self.frame_samples
+            is_speech = level > self.threshold_db
+
+            if self._segment_start is None:
+                if is_speech:
+                    # Open a segment, with a little pre-roll before the onset
+                    self._segment_start = max(frame_start - self.padding, self._last_emitted_end)
+                    self._energies = [level]
+                    self._last_speech_end = self.position
+                continue
+
+            self._energies.append(level)
+            if is_speech:
+                self._last_speech_end = self.position
+
+            length = self.position - self._segment_start
+            silence = self.position - self._last_speech_end
+            if (silence >= self.min_silence and length >= self.min_length) or silence >= self.flush_silence:
+                segments.append(self._close(min(self._last_speech_end + self.padding, self.position)))
+            elif length >= self.max_length:
+                segments.append(self._split_at_quietest())
+        return segments
+
+    def flush(self):
+        """Close the open segment, if any, at the end of the stream."""
+        if self._segment_start is None:
+            return []
+        return [self._close(min(self._last_speech_end + self.padding, self.position))]
+
+    def _close(self, end):
+        segment = (self._segment_start, end)
+        self.speech_samples += end - self._segment_start
+        self._last_emitted_end = end
+        self._segment_start = None
+        self._energies = []
+        return segment
+
+    def _split_at_quietest(self):
+        # Look for the quietest frame in the last third of the segment and cut
+        # after it; the rest of the audio starts the next segment
+        levels = np.asarray(self._energies, dtype=np.float32)
+        search_from = len(levels) * 2 // 3
+        cut_frame = search_from + int(np.argmin(levels[search_from:])) + 1
+        cut = self._segment_start + cut_frame * self.frame_samples
+        remainder = self._energies[cut_frame:]
+
+        segment = self._close(cut)
+        if remainder:
+            self._segment_start = cut
+            self._energies = remainder
+        return segment
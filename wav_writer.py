@@ -0,0 +1,241 @@
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+from metrics import METRICS
+
+# ---------------------------------------------------------------------------
+# WAV header helpers
+# ---------------------------------------------------------------------------
+
+HEADER_SIZE = 44
+
+WAV_FLUSH_SECONDS = METRICS.histogram("wav_flush_seconds", "Time to write (and encode) one batch of audio")
+WAV_BYTES_WRITTEN = METRICS.counter("wav_bytes_written_total", "PCM bytes appended to session audio files")
+
+
+def build_wav_header(data_size, sample_width, channels, rate):
+    """Return the canonical 44-byte PCM WAV header for `data_size` bytes of audio."""
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, rate, rate * block_align, block_align, sample_width * 8,
+        b'data', data_size,
+    )
+
+
+def patch_wav_header(f, data_size):
+    """Rewrite the RIFF and data chunk sizes of an open WAV file in place."""
+    position = f.tell()
+    f.seek(4)
+    f.write(struct.pack('<I', 36 + data_size))
+    f.seek(40)
+    f.write(struct.pack('<I', data_size))
+    f.seek(position)
+
+
+def read_wav_layout(filename):
+    """
+    Locate the PCM data in a WAV file without reading it.
+
+    Returns a dict with channels, sample_width, rate, data_offset and
+    data_size (in bytes).  A data size of zero or one running past the end
+    of the file (as left by a crashed session) is replaced by the bytes that
+    are actually present.
+    """
+    with open(filename, 'rb') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            raise ValueError(f"{filename} is not a WAV file")
+        file_size = os.fstat(f.fileno()).st_size
+        layout = {}
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError(f"{filename} has no data chunk")
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                audio_format, channels, rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if audio_format != 1:
+                    raise ValueError(f"{filename} is not PCM (format {audio_format})")
+                layout.update(channels=channels, sample_width=bits // 8, rate=rate)
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if 'rate' not in layout:
+                    raise ValueError(f"{filename} has no fmt chunk before its data")
+                offset = f.tell()
+                available = file_size - offset
+                if chunk_size == 0 or chunk_size > available:
+                    chunk_size = available
+                block_align = layout['channels'] * layout['sample_width']
+                layout.update(data_offset=offset, data_size=chunk_size // block_align * block_align)
+                return layout
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def recover_wav(filename):
+    """
+    Repair the header of a WAV file left behind by a crashed session so its
+    sizes match the audio that actually reached the disk.  A trailing partial
+    sample frame is truncated.  Returns the number of audio bytes recovered,
+    or None if the file is not a WAV written by StreamingWavWriter.
+    """
+    with open(filename, 'r+b') as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:4] != b'RIFF' or header[36:40] != b'data':
+            print(f"Error: {filename} is not a recoverable WAV file")
+            return None
+
+        block_align = struct.unpack('<H', header[32:34])[0] or 1
+        file_size = f.seek(0, os.SEEK_END)
+        data_size = (file_size - HEADER_SIZE) // block_align * block_align
+        f.truncate(HEADER_SIZE + data_size)
+        patch_wav_header(f, data_size)
+
+    print(f"Recovered {data_size} bytes of audio in {filename}")
+    return data_size
+
+
+# ---------------------------------------------------------------------------
+# Background WAV writer
+# ---------------------------------------------------------------------------
+
+
+class StreamingWavWriter:
+    """
+    Append PCM frames to a WAV file from a background thread.
+
+    `write` only puts the buffer on a queue, so it never blocks the capture
+    loop on disk I/O.  The writer thread batches queued buffers into a single
+    write every `flush_interval` seconds (or once `batch_bytes` are pending)
+    and patches the header after each batch, so the file on disk is a valid
+    WAV holding everything up to the last flush even if the process dies.
+    """
+
+    def __init__(self, filename, sample_width, channels, rate, flush_interval=1.0, batch_bytes=256 * 1024):
+        self.filename = filename
+        self.sample_width = sample_width
+        self.channels = channels
+        self.rate = rate
+        self.flush_interval = flush_interval
+        self.batch_bytes = batch_bytes
+
+        self.bytes_written = 0
+        self.max_backlog = 0  # Largest number of buffers waiting at once
+        self.error = None
+
+        self._file = self._open()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="wav-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """Queue raw PCM bytes for writing.  The buffer must not be modified afterwards."""
+        if self._closed:
+            raise ValueError(f"Cannot write to closed WAV writer for {self.filename}")
+        self._queue.put(data)
+
+    def writeframes(self, data):
+        """Alias matching the wave module's Wave_write interface."""
+        self.write(data)
+
+    @property
+    def frames_written(self):
+        return self.bytes_written // (self.sample_width * self.channels)
+
+    # -- File format hooks (subclasses override these for other formats) ----
+
+    def _open(self):
+        f = open(self.filename, 'wb')
+        f.write(build_wav_header(0, self.sample_width, self.channels, self.rate))
+        f.flush()
+        return f
+
+    def _write_batch(self, batch):
+        self._file.writelines(batch)
+        patch_wav_header(self._file, self.bytes_written + sum(len(b) for b in batch))
+        self._file.flush()
+
+    def _finish(self):
+        try:
+            patch_wav_header(self._file, self.bytes_written)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+
+    def _flush_batch(self, batch):
+        size = sum(len(b) for b in batch)
+        with WAV_FLUSH_SECONDS.time():
+            self._write_batch(batch)
+        self.bytes_written += size
+        WAV_BYTES_WRITTEN.inc(size)
+
+    def _run(self):
+        batch = []
+        pending = 0
+        deadline = time.monotonic() + self.flush_interval
+        done = False
+        while not done:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    done = True
+                else:
+                    batch.append(item)
+                    pending += len(item)
+                    self.max_backlog = max(self.max_backlog, self._queue.qsize() + 1)
+            except queue.Empty:
+                pass
+
+            if batch and (done or pending >= self.batch_bytes or time.monotonic() >= deadline):
+                try:
+                    self._flush_batch(batch)
+                except Exception as e:
+                    # Keep draining so the capture side never backs up; the
+                    # error is reported when the writer is closed
+                    if self.error is None:
+                        self.error = e
+                        print(f"\nError writing audio to {self.filename}: {e}")
+                batch = []
+                pending = 0
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def close(self):
+        """Flush everything queued, finalise the header and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._finish()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# CLI entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2:
+        for wav_file in sys.argv[1:]:
+            recover_wav(wav_file)
+    else:
+        print("Usage:")
+        print("  python wav_writer.py <wav_file> [...]  # Repair WAV headers after a crash")
+        sys.exit(1)